@@ -1,11 +1,12 @@
 """Academic_Research: Research advice, related literature finding, research area proposals, web knowledge access."""
 from google.adk.agents import LlmAgent
-from google.adk.tools.agent_tool import AgentTool
 from . import prompt
-from .sub_agents.paper_abstractor import paper_abstract_agent
-from .sub_agents.academic_websearcher import academic_websearch_agent
+from .planner import EXECUTORS, execute_plan
+from utils.batch_tool import batch
+from utils.parallel_tools import enable_parallel_tools
 
 MODEL = "gemini-2.5-pro"
+enable_parallel_tools("academic_coordinator")
 
 academic_coordinator = LlmAgent(
     name="academic_coordinator",
@@ -20,8 +21,9 @@ academic_coordinator = LlmAgent(
     instruction=prompt.COORDINATOR_PROMPT,
     output_key="seminal_paper",
     tools=[
-        AgentTool(agent=academic_websearch_agent),
-        AgentTool(agent=paper_abstract_agent),
+        batch,
+        execute_plan,
+        *EXECUTORS.values(),
     ],
 )
 
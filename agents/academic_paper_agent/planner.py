@@ -0,0 +1,90 @@
+"""Plan-and-solve executor for the academic_coordinator.
+
+協調者一次規劃出完整的工具呼叫 DAG，由 execute_plan 依相依關係 (Kahn order) 分層並行執行，
+不需要每一步都再經過一次 LLM 往返；失敗時只需針對失敗的節點重新規劃。
+"""
+import asyncio
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.tool_context import ToolContext
+from .sub_agents.paper_abstractor import paper_abstract_agent
+from .sub_agents.academic_websearcher import academic_websearch_agent
+
+EXECUTORS = {
+    executor.name: executor
+    for executor in (
+        AgentTool(agent=academic_websearch_agent),
+        AgentTool(agent=paper_abstract_agent),
+    )
+}
+
+async def _run_node(node: dict, results: dict, tool_context: ToolContext):
+    executor = EXECUTORS.get(node.get("tool"))
+    if executor is None:
+        raise ValueError(f"Unknown tool '{node.get('tool')}', available tools: {', '.join(EXECUTORS)}")
+    request = node.get("args", {}).get("request", "")
+    # 將相依節點的輸出附加在請求之後
+    for dep in node.get("deps", []):
+        request += f"\n\n[{dep}]\n{results[dep]}"
+    return await executor.run_async(args={"request": request}, tool_context=tool_context)
+
+def _validate_plan(nodes) -> dict:
+    """檢查計畫格式，回傳 {節點 id 或位置: 錯誤原因}"""
+    if not isinstance(nodes, list):
+        return {"nodes": "Plan must be a list of nodes"}
+    errors = {}
+    seen = set()
+    for index, node in enumerate(nodes):
+        key = f"nodes[{index}]"
+        if not isinstance(node, dict):
+            errors[key] = "Node must be an object"
+            continue
+        node_id = node.get("id")
+        if not isinstance(node_id, str) or not node_id:
+            errors[key] = "Node is missing a string 'id'"
+            continue
+        if node_id in seen:
+            errors[node_id] = "Duplicate node id"
+            continue
+        seen.add(node_id)
+        deps = node.get("deps", [])
+        if not isinstance(deps, list) or not all(isinstance(dep, str) for dep in deps):
+            errors[node_id] = "'deps' must be a list of node ids"
+    return errors
+
+async def execute_plan(nodes: list[dict], tool_context: ToolContext) -> dict:
+    """
+    Executes a plan of sub-agent calls, running every node whose dependencies are done in parallel.
+
+    Args:
+        nodes: The plan as a list of nodes, e.g.
+            [{"id": "search", "tool": "academic_websearch_agent", "args": {"request": "..."}, "deps": []},
+             {"id": "directions", "tool": "paper_abstract_agent", "args": {"request": "..."}, "deps": ["search"]}].
+            The outputs of the nodes listed in deps are appended to the node's request.
+    Returns:
+        dict: "results" maps node id to its output, "errors" maps node id to the reason it failed or was skipped.
+            If the plan is malformed nothing runs and "errors" maps the node id (or "nodes[i]") to the problem.
+    """
+    # 格式錯誤時不執行任何節點，讓協調者修正後重新規劃
+    errors = _validate_plan(nodes)
+    if errors:
+        return {"results": {}, "errors": errors}
+    pending = {node["id"]: node for node in nodes}
+    results = {}
+    while pending:
+        ready = [node for node in pending.values() if all(dep in results for dep in node.get("deps", []))]
+        if not ready:
+            # 相依節點失敗、不存在或形成循環
+            for node_id, node in pending.items():
+                errors[node_id] = f"Dependencies not satisfied: {node.get('deps', [])}"
+            break
+        outputs = await asyncio.gather(
+            *[_run_node(node, results, tool_context) for node in ready],
+            return_exceptions=True,
+        )
+        for node, output in zip(ready, outputs):
+            del pending[node["id"]]
+            if isinstance(output, Exception):
+                errors[node["id"]] = str(output)
+            else:
+                results[node["id"]] = output
+    return {"results": results, "errors": errors}
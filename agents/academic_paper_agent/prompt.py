@@ -53,4 +53,10 @@ Structure them logically (e.g., numbered list with brief descriptions/rationales
 Conclusion:
 Briefly conclude the interaction, perhaps asking if the user wants to explore any area further.
 
+Execution Planning (Using execute_plan):
+When you already know which tool steps are needed, plan them up front and call execute_plan once instead of invoking the tools one by one.
+Each node has an id, the tool name (academic_websearch_agent or paper_abstract_agent), args with a request string,
+and deps listing the ids whose outputs the node needs. Nodes that do not depend on each other run in parallel.
+If execute_plan reports errors, re-plan only the failed nodes and call execute_plan again.
+
 """
\ No newline at end of file
@@ -1,25 +1,63 @@
 import os
+import time
 import datetime
 from dotenv import load_dotenv
 from google.adk.agents import LlmAgent
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset 
 from google.adk.tools.mcp_tool.mcp_session_manager import StreamableHTTPConnectionParams
+from utils.batch_tool import batch
+from utils.mcp_toolset import CachedMCPToolset
+from utils.parallel_tools import enable_parallel_tools
 
 load_dotenv(".env")
-MODEL = os.getenv('TOOLUSE_MODEL')
+enable_parallel_tools("gourmet_agent")
+# 模型供應者：gemini 或 litellm
+PROVIDER = os.getenv("GOURMET_PROVIDER", "gemini")
+MCP_URL = os.getenv("GOURMET_MCP_URL", "http://localhost:8081/mcp")
 
-def get_system_time() -> str:    
-    now = datetime.datetime.now()    
-    iso8601_time = now.isoformat()  
+if PROVIDER == "litellm":
+    from google.adk.models.lite_llm import LiteLlm
+    from utils.litellm_session import install_shared_httpx
+
+    install_shared_httpx()
+    # 如果要使用AOAI模型就必須在環境變數中定義重要資訊
+    # AZURE_MODEL = os.getenv("AZURE_API_KEY")
+    # AZURE_API_KEY = os.getenv("AZURE_API_KEY")
+    # BASE= os.getenv("AZURE_API_BASE")
+    # AZURE_API_VERSION = os.getenv("AZURE_API_VERSION")
+    MODEL = LiteLlm(
+        model=f"hosted_vllm/hosted_vllm/{os.getenv('LITELLM_MODEL', 'Qwen3-32B')}", # ADK會將第一個/前視為provider，所以litellm中provider要重複
+        # model="azure/gpt-4o", # AOAI 必須使用LiteLLM轉譯後才能使用
+        api_base=os.getenv("LITELLM_BASE"),
+        extra_headers={"Authorization": os.getenv("LITELLM_KEY")},
+    )
+else:
+    MODEL = "gemini-2.5-flash"
+
+# 整個 process 共用同一組 MCP 連線
+MCP_TOOLSET = CachedMCPToolset(connection_params=StreamableHTTPConnectionParams(url=MCP_URL))
+
+_fromtimestamp = datetime.datetime.fromtimestamp
+# (epoch 秒, ISO8601 字串)，同一秒內重複呼叫直接回傳
+_LAST_SYSTEM_TIME = (0, "")
+
+def get_system_time() -> str:
+    global _LAST_SYSTEM_TIME
+    now = int(time.time())
+    if now == _LAST_SYSTEM_TIME[0]:
+        return _LAST_SYSTEM_TIME[1]
+    iso8601_time = _fromtimestamp(now).isoformat()
+    _LAST_SYSTEM_TIME = (now, iso8601_time)
     return iso8601_time
 
+# You must name main agent as root_agent in agent.py for ADK Web to run properly.
 root_agent = LlmAgent(
-    model="gemini-2.5-flash",
+    model=MODEL,
     name="gourmet_agent",
     description="Help you handle all about restaurants and drink shops.",
     instruction="You are an agent that provides services about restaurants and drink shops, you could use mcp-jason to acquire all tools you need.",
     tools=[
+        batch,
         get_system_time,
-        MCPToolset(connection_params=StreamableHTTPConnectionParams(url="http://localhost:8081/mcp"))
+        MCP_TOOLSET
     ]
 )
\ No newline at end of file
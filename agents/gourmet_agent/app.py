@@ -22,6 +22,8 @@ SESSION_SERVICE_URI = os.getenv("SESSION_SERVICE_URI")
 ARTIFACT_SERVICE_URI = os.getenv("ARTIFACT_SERVICE_URI")
 MEMORY_SERVICE_URI = os.getenv("MEMORY_SERVICE_URI")
 TRACE_TO_CLOUD = os.getenv("TRACE_TO_CLOUD", "false").lower() == "true"
+# 只有 litellm 模式才會建立共用的 httpx 連線池
+PROVIDER = os.getenv("GOURMET_PROVIDER", "gemini")
 
 #
 if SESSION_SERVICE_URI == "":
@@ -45,6 +47,10 @@ async def lifespan(app: FastAPI):
     yield
     
     # 關閉時執行
+    if PROVIDER == "litellm":
+        from utils.litellm_session import close_shared_httpx
+
+        await close_shared_httpx()
     print("👋 Shutting down ADK Agent API Server...")
 
 # 
@@ -55,7 +61,7 @@ app = get_fast_api_app(
     memory_service_uri=MEMORY_SERVICE_URI,
     allow_origins=ALLOW_ORIGINS,
     web=False,
-    trace_to_cloud=False,
+    trace_to_cloud=TRACE_TO_CLOUD,
     lifespan=lifespan,
 )
 
@@ -69,12 +75,16 @@ app = get_fast_api_app(
 #         "service": "ADK Agent API"
 #     }
 
+# 開發模式，請在專案根目錄以 python -m agents.gourmet_agent.app 執行
+# 正式環境請使用 gunicorn -c agents/gourmet_agent/gunicorn_conf.py agents.gourmet_agent.app:app
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
-        "app:app",
+        "agents.gourmet_agent.app:app",
         host=HOST,
         port=PORT,
         reload=True,
-        log_level=LOG_LEVEL.lower()
+        log_level=LOG_LEVEL.lower(),
+        loop="uvloop",
+        http="httptools"
     )
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""
+Production entrypoint for the ADK Agent API Server.
+
+Usage (under the project root, so that utils/ and tools/ are importable):
+    gunicorn -c agents/gourmet_agent/gunicorn_conf.py agents.gourmet_agent.app:app
+
+Multiple workers need shared backends: each worker is a separate process, so with the
+default in-memory services a session created in one worker is "not found" in another.
+Set SESSION_SERVICE_URI (and ARTIFACT_SERVICE_URI / MEMORY_SERVICE_URI if the agents
+use artifacts or memory) before raising WEB_CONCURRENCY above 1.
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "4201"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+bind = f"{HOST}:{PORT}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# 有共用的 session 服務時預設 2n+1 個 worker，否則 session 存在各 worker 記憶體中只能用 1 個，可用 WEB_CONCURRENCY 覆寫
+SHARED_SESSIONS = bool(os.getenv("SESSION_SERVICE_URI"))
+workers = int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1 if SHARED_SESSIONS else 1))
+if workers > 1 and not SHARED_SESSIONS:
+    raise RuntimeError("WEB_CONCURRENCY > 1 requires SESSION_SERVICE_URI, in-memory sessions are not shared between workers")
+loglevel = LOG_LEVEL.lower()
+keepalive = 30
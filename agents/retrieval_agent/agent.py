@@ -2,8 +2,10 @@ import os
 from google.adk.agents import Agent
 from dotenv import load_dotenv
 from tools.milvustool import MilvusTool
+from utils.parallel_tools import enable_parallel_tools
 
 load_dotenv()
+enable_parallel_tools("ask_rag_agent")
 agent_prompt = ""
 milvus_tool = MilvusTool()
 
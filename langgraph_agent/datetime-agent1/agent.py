@@ -1,19 +1,36 @@
-from typing import TypedDict, Annotated, Optional, List
+from typing import TypedDict, Annotated, Optional, List, Union
 from datetime import datetime
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_community.chat_models import ChatLiteLLM
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-import json
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+import os
+import re
+import functools
+import orjson
+import asyncio
 import uvicorn
+from utils.litellm_session import install_shared_httpx, close_shared_httpx
+
+# 所有 LiteLLM 請求共用同一個連線池
+install_shared_httpx()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_shared_httpx()
 
 # FastAPI 應用
 app = FastAPI(
     title="日期擷取 Agent API",
     description="從用戶查詢中提取日期時間資訊並轉換為指定格式",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # 請求模型
@@ -32,11 +49,15 @@ class DateExtractionRequest(BaseModel):
 class DateInfo(BaseModel):
     original: str
     type: Optional[str] = None
-    start: Optional[str] = None
-    end: Optional[str] = None
+    # timestamp 格式會輸出整數
+    start: Optional[Union[str, int]] = None
+    end: Optional[Union[str, int]] = None
     confidence: Optional[str] = None
     error: Optional[str] = None
 
+# 一次驗證整個列表
+_DATEINFO_LIST = TypeAdapter(List[DateInfo])
+
 class DateExtractionResponse(BaseModel):
     success: bool
     query: str
@@ -55,7 +76,8 @@ class DateExtractionState(TypedDict):
     model_name: str
 
 # 系統提示詞
-SYSTEM_PROMPT = """你是一個專業的日期時間擷取助手。你的任務是從用戶的查詢中識別並提取所有日期和時間資訊。
+# 內容固定不變，讓 vLLM 的 prefix caching 可以重用 KV-cache（vLLM 需以 --enable-prefix-caching 啟動）
+SYSTEM_PROMPT_STATIC = """你是一個專業的日期時間擷取助手。你的任務是從用戶的查詢中識別並提取所有日期和時間資訊。
 
 請仔細分析用戶的輸入，識別以下類型的日期時間表達：
 - 絕對日期：如「2024年3月15日」、「明天」、「下週一」
@@ -63,75 +85,82 @@ SYSTEM_PROMPT = """你是一個專業的日期時間擷取助手。你的任務
 - 時間點：如「下午3點」、「早上9:30」
 - 日期範圍：如「這週」、「本月」、「2024年第一季」
 
-當前日期時間參考點：{current_datetime}
-
 請以 JSON 格式返回提取結果，格式如下：
-{{
+{
     "dates": [
-        {{
+        {
             "original_text": "原始文字表達",
             "type": "absolute/relative/range",
             "start_datetime": "YYYY-MM-DDTHH:MM:SS",
             "end_datetime": "YYYY-MM-DDTHH:MM:SS (如果是範圍)",
             "confidence": "high/medium/low"
-        }}
+        }
     ]
-}}
+}
 
-如果沒有找到日期資訊，返回：{{"dates": []}}
+如果沒有找到日期資訊，返回：{"dates": []}
 """
 
-def extract_dates_node(state: DateExtractionState) -> DateExtractionState:
+# 會隨請求變動的內容放在最後，避免破壞前綴快取
+DATETIME_REFERENCE = "當前日期時間參考點：{current_datetime}"
+
+# 預先綁定，減少迴圈中的屬性查找
+_now = datetime.now
+_fromiso = datetime.fromisoformat
+
+# 擷取 markdown 代碼塊中的 JSON
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+@functools.lru_cache(maxsize=8)
+def _get_llm(model_name: str) -> ChatLiteLLM:
+    """依模型名稱共用同一個 LiteLLM 客戶端"""
+    return ChatLiteLLM(model=model_name, temperature=0, streaming=False)
+
+async def extract_dates_node(state: DateExtractionState) -> DateExtractionState:
     """從用戶查詢中提取日期資訊"""
     user_query = state["user_query"]
     model_name = state.get("model_name", "hosted_vllm/gpt-oss-120b")
-    current_datetime = datetime.now().isoformat()
+    current_datetime = _now().isoformat()
     
-    # 初始化 LiteLLM
-    llm = ChatLiteLLM(model=model_name, temperature=0)
+    # 取得 LiteLLM 客戶端
+    llm = _get_llm(model_name)
     
     # 構建提示詞
-    system_msg = SystemMessage(content=SYSTEM_PROMPT.format(
-        current_datetime=current_datetime
+    system_msg = SystemMessage(content=SYSTEM_PROMPT_STATIC)
+    user_msg = HumanMessage(content=(
+        f"請從以下查詢中提取日期時間資訊：\n\n{user_query}\n\n"
+        + DATETIME_REFERENCE.format(current_datetime=current_datetime)
     ))
-    user_msg = HumanMessage(content=f"請從以下查詢中提取日期時間資訊：\n\n{user_query}")
     
     try:
         # 調用 LLM
-        response = llm.invoke([system_msg, user_msg])
+        response = await llm.ainvoke([system_msg, user_msg])
         
         # 解析 JSON 響應
         content = response.content
         # 嘗試提取 JSON（可能包含在 markdown 代碼塊中）
-        if "```json" in content:
-            json_str = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            json_str = content.split("```")[1].split("```")[0].strip()
-        else:
-            json_str = content.strip()
+        match = _FENCE_RE.search(content)
+        json_str = match.group(1) if match else content.strip()
         
-        result = json.loads(json_str)
+        result = orjson.loads(json_str)
         
         return {
-            **state,
             "extracted_dates": result.get("dates", []),
             "messages": [response]
         }
     except Exception as e:
         return {
-            **state,
             "error": f"日期提取失敗: {str(e)}",
             "extracted_dates": []
         }
 
-def format_dates_node(state: DateExtractionState) -> DateExtractionState:
+async def format_dates_node(state: DateExtractionState) -> DateExtractionState:
     """將提取的日期轉換為指定格式"""
     extracted_dates = state.get("extracted_dates", [])
     output_format = state.get("output_format", "iso8601")
     
     if not extracted_dates:
         return {
-            **state,
             "formatted_output": "未找到日期資訊"
         }
     
@@ -152,18 +181,18 @@ def format_dates_node(state: DateExtractionState) -> DateExtractionState:
             
             elif output_format == "timestamp":
                 # 轉換為 Unix 時間戳
-                start_dt = datetime.fromisoformat(date_info.get("start_datetime"))
+                start_dt = _fromiso(date_info.get("start_datetime"))
                 formatted_date["start"] = int(start_dt.timestamp())
                 if date_info.get("end_datetime"):
-                    end_dt = datetime.fromisoformat(date_info.get("end_datetime"))
+                    end_dt = _fromiso(date_info.get("end_datetime"))
                     formatted_date["end"] = int(end_dt.timestamp())
             
             elif output_format == "readable":
                 # 轉換為可讀格式
-                start_dt = datetime.fromisoformat(date_info.get("start_datetime"))
+                start_dt = _fromiso(date_info.get("start_datetime"))
                 formatted_date["start"] = start_dt.strftime("%Y年%m月%d日 %H:%M:%S")
                 if date_info.get("end_datetime"):
-                    end_dt = datetime.fromisoformat(date_info.get("end_datetime"))
+                    end_dt = _fromiso(date_info.get("end_datetime"))
                     formatted_date["end"] = end_dt.strftime("%Y年%m月%d日 %H:%M:%S")
             
             formatted_date["confidence"] = date_info.get("confidence")
@@ -176,8 +205,7 @@ def format_dates_node(state: DateExtractionState) -> DateExtractionState:
             })
     
     return {
-        **state,
-        "formatted_output": json.dumps(formatted_results, ensure_ascii=False, indent=2)
+        "formatted_output": orjson.dumps(formatted_results).decode()
     }
 
 def should_continue(state: DateExtractionState) -> str:
@@ -213,6 +241,34 @@ def create_date_extraction_agent():
 
 # 全局 Agent 實例
 agent = create_date_extraction_agent()
+# 批量請求同時送往 vLLM 的上限
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "16"))
+
+def build_initial_state(query: str, output_format: str, model_name: str) -> DateExtractionState:
+    """建立 Agent 的初始狀態"""
+    return {
+        "user_query": query,
+        "output_format": output_format,
+        "model_name": model_name,
+        "messages": [],
+        "extracted_dates": None,
+        "formatted_output": None,
+        "error": None
+    }
+
+async def run_batch_async(states: List[DateExtractionState]) -> List:
+    """
+    並行執行多個 Agent 狀態，回傳結果的順序與輸入相同
+    
+    單筆失敗時回傳該筆的 Exception，不影響其他查詢
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run_one(state: DateExtractionState):
+        async with semaphore:
+            return await agent.ainvoke(state)
+
+    return await asyncio.gather(*[run_one(state) for state in states], return_exceptions=True)
 
 # FastAPI 路由
 @app.get("/")
@@ -237,40 +293,35 @@ async def extract_dates(request: DateExtractionRequest):
     """
     try:
         # 執行 Agent
-        result = agent.invoke({
-            "user_query": request.query,
-            "output_format": request.output_format,
-            "model_name": request.model_name,
-            "messages": [],
-            "extracted_dates": None,
-            "formatted_output": None,
-            "error": None
-        })
+        result = await agent.ainvoke(build_initial_state(
+            request.query,
+            request.output_format,
+            request.model_name
+        ))
         
         # 解析結果
         if result.get("error"):
-            return DateExtractionResponse(
+            return ORJSONResponse(content=DateExtractionResponse(
                 success=False,
                 query=request.query,
                 extracted_dates=[],
                 formatted_output="",
                 error=result["error"]
-            )
+            ).model_dump())
         
         # 解析格式化輸出
         try:
-            formatted_data = json.loads(result["formatted_output"])
-            date_infos = [DateInfo(**item) for item in formatted_data]
-        except:
+            date_infos = _DATEINFO_LIST.validate_json(result["formatted_output"])
+        except ValidationError:
             date_infos = []
         
-        return DateExtractionResponse(
+        return ORJSONResponse(content=DateExtractionResponse(
             success=True,
             query=request.query,
             extracted_dates=date_infos,
             formatted_output=result["formatted_output"],
             error=None
-        )
+        ).model_dump())
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"處理請求時發生錯誤: {str(e)}")
@@ -287,39 +338,39 @@ async def extract_dates_batch(queries: List[str], output_format: str = "iso8601"
     Returns:
         批量處理結果
     """
+    states = [
+        build_initial_state(query, output_format, "hosted_vllm/gpt-oss-120b")
+        for query in queries
+    ]
+    batch_results = await run_batch_async(states)
+
     results = []
-    for query in queries:
-        try:
-            result = agent.invoke({
-                "user_query": query,
-                "output_format": output_format,
-                "model_name": "hosted_vllm/gpt-oss-120b",
-                "messages": [],
-                "extracted_dates": None,
-                "formatted_output": None,
-                "error": None
-            })
-            results.append({
-                "query": query,
-                "success": not bool(result.get("error")),
-                "result": result["formatted_output"] if not result.get("error") else None,
-                "error": result.get("error")
-            })
-        except Exception as e:
+    for query, result in zip(queries, batch_results):
+        if isinstance(result, Exception):
             results.append({
                 "query": query,
                 "success": False,
                 "result": None,
-                "error": str(e)
+                "error": str(result)
             })
+            continue
+        results.append({
+            "query": query,
+            "success": not bool(result.get("error")),
+            "result": result["formatted_output"] if not result.get("error") else None,
+            "error": result.get("error")
+        })
     
     return {"results": results}
 
 # 啟動服務
 if __name__ == "__main__":
     uvicorn.run(
-        "main:app",  # 請根據你的檔案名稱調整
+        # 請在專案根目錄以 python -m langgraph_agent.datetime-agent1.agent 執行
+        "langgraph_agent.datetime-agent1.agent:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=True,
+        loop="uvloop",
+        http="httptools"
     )
\ No newline at end of file
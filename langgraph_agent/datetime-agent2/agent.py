@@ -1,4 +1,5 @@
 import os
+import asyncio
 import langchain
 from datetime import datetime
 from dotenv import load_dotenv
@@ -13,11 +14,15 @@ from langchain_core.messages import (
 from langchain_litellm import ChatLiteLLM
 from langgraph.func import entrypoint, task
 from langgraph.graph import add_messages
+from utils.litellm_session import install_shared_httpx, close_shared_httpx
 
 load_dotenv(".env")
+install_shared_httpx()
 model = os.getenv("MODEL")
 api_base = os.getenv("LITELLM_BASE")
 api_key = os.getenv("LITELLM_KEY")
+# 同一輪的多個 tool call 是否並行執行，有狀態的工具請設為 false
+PARALLEL_TOOL_CALLS = os.getenv("PARALLEL_TOOL_CALLS", "true").lower() == "true"
 
 # llm = init_chat_model(
 #     "anthropic:claude-sonnet-4-5-20250929",
@@ -35,12 +40,14 @@ llm = ChatLiteLLM(
     top_p=1.0,
     streaming=True)
 
+_now = datetime.now
+
 # Define tools
 @tool
 def get_current_datetime():
     """Get current system datetime and return datetime in ISO8601 format.
     """
-    return datetime.now().isoformat()
+    return _now().isoformat()
 
 # Augment the LLM with tools
 tools = [get_current_datetime]
@@ -49,9 +56,9 @@ llm_with_tools = llm.bind_tools(tools)
 
 # Step 2: define model node
 @task
-def call_llm(messages: list[BaseMessage]):
+async def call_llm(messages: list[BaseMessage]):
     """LLM decides whether to call a tool or not"""
-    return llm_with_tools.invoke(
+    return await llm_with_tools.ainvoke(
         [
             SystemMessage(
                 content="You are accurate datetime info extractor, your task is to extract datetime information form user query then convert it into ISO8601 format, and output the datatime string only. To analysis the time information in user query, sometimes you will need to know the current dateime, if so, you could call the tool get_current_datetime to get the current datetime."
@@ -63,34 +70,50 @@ def call_llm(messages: list[BaseMessage]):
 
 # Step 3: define tool node
 @task
-def call_tool(tool_call: ToolCall):
+async def call_tool(tool_call: ToolCall):
     """Performs the tool call"""
     tool = tools_by_name[tool_call["name"]]
-    return tool.invoke(tool_call)
+    return await tool.ainvoke(tool_call)
 
 
 # Step 4: define agent
 @entrypoint()
-def agent(messages: list[BaseMessage]):
-    llm_response = call_llm(messages).result()
+async def agent(messages: list[BaseMessage]):
+    llm_response = await call_llm(messages)
 
     while True:
         if not llm_response.tool_calls:
             break
 
         # Execute tools
-        tool_result_futures = [
-            call_tool(tool_call) for tool_call in llm_response.tool_calls
-        ]
-        tool_results = [fut.result() for fut in tool_result_futures]
+        if PARALLEL_TOOL_CALLS:
+            tool_results = await asyncio.gather(
+                *[call_tool(tool_call) for tool_call in llm_response.tool_calls]
+            )
+        else:
+            tool_results = [
+                await call_tool(tool_call) for tool_call in llm_response.tool_calls
+            ]
         messages = add_messages(messages, [llm_response, *tool_results])
-        llm_response = call_llm(messages).result()
+        llm_response = await call_llm(messages)
 
     messages = add_messages(messages, llm_response)
     return messages
 
 # Invoke
-messages = [HumanMessage(content="我的生日是")]
-for chunk in agent.stream(messages, stream_mode="updates"):
-    print(chunk)
-    print("\n")
\ No newline at end of file
+async def main():
+    messages = [HumanMessage(content="我的生日是")]
+    async for chunk in agent.astream(messages, stream_mode="updates"):
+        print(chunk)
+        print("\n")
+    await close_shared_httpx()
+
+if __name__ == "__main__":
+    # 請在專案根目錄以 python -m langgraph_agent.datetime-agent2.agent 執行
+    try:
+        import uvloop
+    except ImportError:
+        # uvloop 不支援 Windows，沒有安裝時使用預設的 event loop
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
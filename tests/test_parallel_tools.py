@@ -0,0 +1,94 @@
+"""utils.parallel_tools 替換 ADK 私有的 functions.__call_tool_async，升級 ADK 後先跑這裡確認仍然有效"""
+import asyncio
+from types import SimpleNamespace
+from typing import AsyncGenerator
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.flows.llm_flows import functions
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from utils import parallel_tools
+
+LIMIT = 2
+CALLS = 5
+
+@pytest.fixture
+def tracker(monkeypatch):
+    """記錄同時執行中的工具數量，測試結束後還原 ADK 與 parallel_tools 的狀態"""
+    state = {"active": 0, "peak": 0}
+
+    async def fake_call_tool_async(tool, args, tool_context):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        return {"i": args["i"]}
+
+    # 以目前的值再設定一次，讓 monkeypatch 在結束時還原 enable_parallel_tools() 的替換
+    monkeypatch.setattr(functions, "__call_tool_async", getattr(functions, "__call_tool_async"))
+    monkeypatch.setattr(parallel_tools, "_call_tool_async", fake_call_tool_async)
+    monkeypatch.setattr(parallel_tools, "_PARALLEL_AGENTS", set())
+    monkeypatch.setattr(parallel_tools, "TOOL_CONCURRENCY_LIMIT", LIMIT)
+    return state
+
+async def _dispatch(contexts):
+    call_tool_async = getattr(functions, "__call_tool_async")
+    return await asyncio.gather(*[
+        call_tool_async(SimpleNamespace(name="slow"), args={"i": i}, tool_context=context)
+        for i, context in enumerate(contexts)
+    ])
+
+def test_enable_replaces_adk_call_tool_async(tracker):
+    parallel_tools.enable_parallel_tools("opted_in")
+    assert getattr(functions, "__call_tool_async") is parallel_tools._dispatch_tool_async
+
+def test_limit_applies_per_invocation(tracker):
+    parallel_tools.enable_parallel_tools("opted_in")
+    contexts = [SimpleNamespace(agent_name="opted_in", invocation_id="inv-1")] * CALLS
+    results = asyncio.run(_dispatch(contexts))
+    assert results == [{"i": i} for i in range(CALLS)]
+    assert tracker["peak"] == LIMIT
+
+def test_invocations_do_not_share_the_limit(tracker):
+    parallel_tools.enable_parallel_tools("opted_in")
+    contexts = [SimpleNamespace(agent_name="opted_in", invocation_id=f"inv-{i}") for i in range(CALLS)]
+    asyncio.run(_dispatch(contexts))
+    assert tracker["peak"] == CALLS
+
+def test_other_agents_keep_adk_dispatch(tracker):
+    parallel_tools.enable_parallel_tools("opted_in")
+    contexts = [SimpleNamespace(agent_name="other", invocation_id="inv-1")] * CALLS
+    asyncio.run(_dispatch(contexts))
+    assert tracker["peak"] == CALLS
+
+class _ParallelCallsLlm(BaseLlm):
+    """第一輪同時要求 CALLS 個工具呼叫，收到結果後結束"""
+    model: str = "parallel-calls"
+
+    async def generate_content_async(self, llm_request, stream=False) -> AsyncGenerator[LlmResponse, None]:
+        if llm_request.contents[-1].parts[0].function_response:
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="done")]))
+            return
+        yield LlmResponse(content=types.Content(role="model", parts=[
+            types.Part(function_call=types.FunctionCall(name="slow", args={"i": i})) for i in range(CALLS)
+        ]))
+
+def test_limit_applies_through_adk_runner(tracker):
+    async def slow(i: int) -> dict:
+        return {"i": i}
+
+    agent = LlmAgent(name="opted_in", model=_ParallelCallsLlm(), tools=[slow])
+    parallel_tools.enable_parallel_tools("opted_in")
+
+    async def run():
+        runner = InMemoryRunner(agent=agent, app_name="parallel_tools_test")
+        session = await runner.session_service.create_session(app_name="parallel_tools_test", user_id="user")
+        message = types.Content(role="user", parts=[types.Part(text="hi")])
+        return [event async for event in runner.run_async(user_id="user", session_id=session.id, new_message=message)]
+
+    events = asyncio.run(run())
+    responses = [part.function_response.response for event in events for part in event.content.parts if part.function_response]
+    assert sorted(response["i"] for response in responses) == list(range(CALLS))
+    assert tracker["peak"] == LIMIT
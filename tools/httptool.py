@@ -1,6 +1,10 @@
 # 用於執行各種HTTP Methods
 import json
+import threading
 import requests
+from cachetools import TTLCache, cached
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from fastmcp import FastMCP
 from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field
@@ -11,6 +15,16 @@ class HttpPostPayload(BaseModel):
     tags: Optional[List[str]] = Field(None, description="可選的標籤列表。")
     published: bool = Field(True, description="資源是否公開發佈。")
 
+# 共用連線池，避免每次請求都重新建立 TCP/TLS 連線
+REQUEST_TIMEOUT = 10
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=Retry(total=2, backoff_factor=0.2))
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+
+# 同一個 API 的 OpenAPI Schema 在短時間內不會改變
+_OPENAPI_CACHE = TTLCache(maxsize=64, ttl=300)
+
 mcp = FastMCP(name="HTTP Proxy Server", instructions="此伺服器提供四種 HTTP 方法，以代理 LLM 對外部 API 進行調用。")
 
 @mcp.tool
@@ -18,20 +32,23 @@ def get_openapi_schema(url: str):
     """
     對一個未知內容的API端點執行HTTP GET 請求，並回傳該API端點的Openapi Schema，以便後續生成訪問端點的請求指令。
     """
-    if url.endswith('/'):
-        base = url + "openapi.json"
-    else:
-        base = url + "/openapi.json"
+    base = url.rstrip('/') + "/openapi.json"
     try:
-        response = requests.get(base)
-        response.raise_for_status()
-        try:
-            return response.json()
-        except requests.exceptions.JSONDecodeError:
-            return response.text
+        return _fetch_openapi_schema(base)
     except requests.exceptions.RequestException as e:
         return {"error": f"HTTP GET request failed: {e}"}
 
+# FastMCP 在 worker thread 執行同步工具，TTLCache 本身不是 thread-safe
+@cached(_OPENAPI_CACHE, lock=threading.Lock())
+def _fetch_openapi_schema(base: str):
+    # 失敗時會拋出例外，不會被寫入快取
+    response = _SESSION.get(base, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    try:
+        return response.json()
+    except requests.exceptions.JSONDecodeError:
+        return response.text
+
 @mcp.tool
 def http_post(url: str, data: HttpPostPayload) -> Dict[str, Any]:
     """
@@ -43,7 +60,7 @@ def http_post(url: str, data: HttpPostPayload) -> Dict[str, Any]:
         Dict[str, Any]: 伺服器響應的 JSON 物件。
     """
     try:
-        response = requests.post(url, json=data.model_dump())
+        response = _SESSION.post(url, json=data.model_dump(), timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -61,7 +78,7 @@ def http_put(url: str, data: HttpPostPayload) -> Dict[str, Any]:
         Dict[str, Any]: 伺服器響應的 JSON 物件。
     """
     try:
-        response = requests.put(url, json=data.model_dump())
+        response = _SESSION.put(url, json=data.model_dump(), timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -77,7 +94,7 @@ def http_delete(url: str) -> Dict[str, Any]:
         Dict[str, Any]: 伺服器響應的 JSON 物件。
     """
     try:
-        response = requests.delete(url)
+        response = _SESSION.delete(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         try:
             return response.json()
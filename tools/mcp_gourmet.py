@@ -1,22 +1,18 @@
 import os
-import json
+import orjson
 import asyncio
-import httpx
+import aiofiles
 import random
+import itertools
 import uvicorn
-from collections import OrderedDict
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Request, Query, Body
+from fastapi import FastAPI, HTTPException, Query, Body, Response
+from fastapi.responses import ORJSONResponse
 from fastmcp import FastMCP
-from pydantic import BaseModel, RootModel, Field
-from starlette.applications import Starlette
+from pydantic import BaseModel, RootModel, Field, ValidationError
 from starlette.middleware.cors import CORSMiddleware
-from starlette.routing import Mount
 from typing import Optional, List, Dict, Annotated
-# import sys # Disable when executing under root folder
-# sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Disable when executing under root folder
-# from utils.llm_client import GeminiClient, OllamaClient
 
 class PlaceResponse(BaseModel):
     """
@@ -78,9 +74,35 @@ class PlaceType(BaseModel):
 
 load_dotenv(".env")
 places_path = os.getenv("PLACES_PATH")
-file_lock = asyncio.Lock()
-
-app = FastAPI(title="Lunch&Drink API")
+# 新增、更新、刪除店家都只 append 一筆操作到 JSONL 日誌，日誌超過 JOURNAL_COMPACT_BYTES 時才重寫主檔並併入日誌
+# 未設定 PLACES_PATH 時仍可 import 此模組，直到第一次讀取店家才回報設定錯誤
+journal_path = os.path.splitext(places_path)[0] + ".jsonl" if places_path else None
+JOURNAL_COMPACT_BYTES = int(os.getenv("JOURNAL_COMPACT_BYTES", str(1024 * 1024)))
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+# 店家清單超過此大小 (bytes) 時改為分段序列化，每段之間讓出 event loop
+SERIALIZE_CHUNK_THRESHOLD = int(os.getenv("SERIALIZE_CHUNK_THRESHOLD", str(512 * 1024)))
+SERIALIZE_CHUNK_SIZE = 500
+# 每個 worker 各自持有店家快取與 MCP session，寫入與 MCP 連線不會跨 worker 協調，預設只開一個 worker
+MCP_GOURMET_WORKERS = int(os.getenv("MCP_GOURMET_WORKERS", "1"))
+# 讀取一律走快取不加鎖；新增、更新、刪除店家時從檢查到寫入日誌、更新快取都持有鎖，主檔只在 rename 的瞬間持有鎖
+_write_lock = asyncio.Lock()
+# 避免多個請求同時重新讀取檔案而互相覆蓋快取
+_load_lock = asyncio.Lock()
+# 每次寫入依序編號，用來判斷快照新舊
+_write_seq = itertools.count(1)
+# 以店名為 key 的店家 (維持檔案順序)、PlaceResponse 欄位摘要、類型索引、最大 id 與檔案 mtime，
+# 檔案被外部修改時會自動重新讀取；檔案中仍以 list 儲存
+# listings 為已序列化的店家清單 (key 為 ("json" 或 "text", type)，type 為 "" 代表全部)，新增或刪除店家時清空
+# journal 為尚未併入主檔的 (寫入編號, 日誌行)，saved_seq 為最後一次寫入主檔的快照編號
+# pending 為進行中的寫入數量，此時快取比檔案新，不能因 mtime 變動而重新讀取
+_CACHE = {"places": None, "summaries": {}, "listings": {}, "by_type": {}, "max_id": 0, "mtime": None, "size": 0,
+          "journal": [], "journal_size": 0, "compacting": False, "saved_seq": 0, "pending": 0}
+# 背景壓縮日誌的 task，保留參照避免被 GC
+_background_tasks = set()
+# 可快取清單的店家類型，其他 type 值不快取以免 listings 無限增長
+PLACE_TYPES = ("food", "drink")
+
+app = FastAPI(title="Lunch&Drink API", default_response_class=ORJSONResponse)
 mcp = FastMCP()
 
 # Declaring API Endpoints
@@ -92,14 +114,164 @@ def read_root():
 async def health_check():
     return {"status": "ok"}
 
-@asynccontextmanager
-async def locked_file_operation(mode: str = "r"):
-    await file_lock.acquire()
+def _summarize(place: dict) -> dict:
+    return {field: place[field] for field in PlaceResponse.model_fields}
+
+def _list_summaries(cache: dict, place_type: Optional[str] = None) -> list:
+    names = cache["by_type"].get(place_type, []) if place_type else cache["places"]
+    return [cache["summaries"][name] for name in names]
+
+def _places_mtime() -> tuple:
+    if not places_path:
+        raise RuntimeError("PLACES_PATH is not set; point it at the places JSON file")
+    # 使用奈秒精度，避免同一時間單位內的外部修改被誤判為未變動
+    journal_mtime = os.stat(journal_path).st_mtime_ns if os.path.exists(journal_path) else 0
+    return (os.stat(places_path).st_mtime_ns, journal_mtime)
+
+def _cache_is_fresh() -> bool:
+    if _CACHE["places"] is None:
+        return False
+    return _CACHE["pending"] > 0 or (CACHE_ENABLED and _CACHE["mtime"] == _places_mtime())
+
+async def _load_places() -> dict:
+    if _cache_is_fresh():
+        return _CACHE
+    async with _load_lock:
+        if _cache_is_fresh():
+            return _CACHE
+        return await _read_places()
+
+def _apply_op(places: dict, op: dict):
+    # 每筆操作都直接決定該店家的結果，主檔已包含部分日誌時重播仍會得到相同結果
+    if op["op"] == "add":
+        places[op["place"]["name"]] = op["place"]
+    elif op["op"] == "delete":
+        places.pop(op["name"], None)
+    elif op["op"] == "update_menu" and op["name"] in places:
+        places[op["name"]]["menu"] = op["menu"]
+
+async def _read_places() -> dict:
+    mtime = _places_mtime()
+    async with aiofiles.open(places_path, "rb") as file:
+        raw = await file.read()
+    places = {place["name"]: place for place in orjson.loads(raw)}
+    journal = []
+    torn = False
+    if os.path.exists(journal_path):
+        async with aiofiles.open(journal_path, "rb") as file:
+            lines = (await file.read()).splitlines(keepends=True)
+        for line in lines:
+            try:
+                op = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                # append 到一半中斷留下的不完整行
+                torn = True
+                continue
+            _apply_op(places, op)
+            journal.append((0, line if line.endswith(b"\n") else line + b"\n"))
+    if torn:
+        async with _write_lock:
+            await _write_journal(journal)
+        mtime = _places_mtime()
+    _CACHE["places"] = places
+    # 檔案內容皆由已驗證的請求寫入，不需再經過 PlaceResponse 驗證
+    _CACHE["summaries"] = {name: _summarize(place) for name, place in places.items()}
+    _CACHE["listings"] = {}
+    by_type = {}
+    for name, place in places.items():
+        by_type.setdefault(place["type"], []).append(name)
+    _CACHE["by_type"] = by_type
+    _CACHE["max_id"] = max((place["id"] for place in places.values()), default=0)
+    _CACHE["journal"] = journal
+    _CACHE["journal_size"] = sum(len(line) for _, line in journal)
+    _CACHE["size"] = len(raw)
+    _CACHE["mtime"] = mtime
+    return _CACHE
+
+async def _append_op(op: dict):
+    # 呼叫端需持有 _write_lock，並在這裡成功返回後才更新快取，寫入失敗時快取維持原狀
+    seq = next(_write_seq)
+    line = orjson.dumps(op) + b"\n"
+    _CACHE["pending"] += 1
+    try:
+        async with aiofiles.open(journal_path, "ab") as file:
+            await file.write(line)
+            await file.flush()
+            await asyncio.to_thread(os.fsync, file.fileno())
+        _CACHE["journal"].append((seq, line))
+        _CACHE["journal_size"] += len(line)
+        _CACHE["mtime"] = _places_mtime()
+    finally:
+        _CACHE["pending"] -= 1
+    if _CACHE["journal_size"] > JOURNAL_COMPACT_BYTES and not _CACHE["compacting"]:
+        _CACHE["compacting"] = True
+        task = asyncio.create_task(_compact_journal())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+async def _compact_journal():
+    try:
+        await _save_places(_CACHE["places"])
+    finally:
+        _CACHE["compacting"] = False
+
+async def _dumps_places(snapshot: list) -> bytes:
+    # orjson 執行期間不會釋放 GIL，丟到 thread 也無法讓 event loop 繼續處理其他請求，
+    # 因此大檔案改為分段序列化並在段落之間讓出 event loop
+    if _CACHE["size"] <= SERIALIZE_CHUNK_THRESHOLD:
+        return orjson.dumps(snapshot)
+    chunks = []
+    for start in range(0, len(snapshot), SERIALIZE_CHUNK_SIZE):
+        chunks.append(orjson.dumps(snapshot[start:start + SERIALIZE_CHUNK_SIZE])[1:-1])
+        await asyncio.sleep(0)
+    return b"[" + b",".join(chunks) + b"]"
+
+async def _save_places(places: dict):
+    # 呼叫端修改快取後立即在這裡編號並取出快照，分段序列化期間其他請求新增或刪除店家不會影響這份快照
+    seq = next(_write_seq)
+    snapshot = list(places.values())
+    _CACHE["pending"] += 1
     try:
-        with open(places_path, mode, encoding="utf-8") as file:
-            yield file
+        content = await _dumps_places(snapshot)
+        await _replace_places(seq, content)
     finally:
-        file_lock.release()
+        _CACHE["pending"] -= 1
+
+async def _replace_places(seq: int, content: bytes):
+    tmp_path = f"{places_path}.{seq}.tmp"
+    async with aiofiles.open(tmp_path, "wb") as file:
+        await file.write(content)
+        # rename 前先確保內容已落盤，斷電時才不會留下被替換成空檔的主檔
+        await file.flush()
+        await asyncio.to_thread(os.fsync, file.fileno())
+    async with _write_lock:
+        if seq < _CACHE["saved_seq"]:
+            # 較新的快照已經寫入主檔
+            os.remove(tmp_path)
+            return
+        # 以 rename 原子替換主檔，避免寫到一半中斷時檔案損毀
+        os.replace(tmp_path, places_path)
+        _CACHE["saved_seq"] = seq
+        _CACHE["size"] = len(content)
+        # 快照之後才寫入的操作仍需保留在日誌中
+        journal = [(entry_seq, line) for entry_seq, line in _CACHE["journal"] if entry_seq > seq]
+        await _write_journal(journal)
+        _CACHE["journal"] = journal
+        _CACHE["journal_size"] = sum(len(line) for _, line in journal)
+        _CACHE["mtime"] = _places_mtime()
+
+async def _write_journal(journal: list):
+    # 呼叫端需持有 _write_lock
+    if not journal:
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+        return
+    tmp_path = f"{journal_path}.tmp"
+    async with aiofiles.open(tmp_path, "wb") as file:
+        await file.write(b"".join(line for _, line in journal))
+        await file.flush()
+        await asyncio.to_thread(os.fsync, file.fileno())
+    os.replace(tmp_path, journal_path)
 
 @app.get(
         "/get_places", 
@@ -119,12 +291,14 @@ async def get_places(
     查詢參數說明：
     - **type**: 店家類型, 只能是 'food' (餐廳) 或 'drink' (飲料店), 這個參數是optional
     """
-    with open(places_path, "r", encoding="utf-8") as file:
-        data = json.load(file)
-    places = [PlaceResponse(**place) for place in data]
-    if type:
-        places = [place for place in places if place.type == type]
-    return places
+    cache = await _load_places()
+    if type is not None and type not in PLACE_TYPES:
+        return Response(content=orjson.dumps(_list_summaries(cache, type)), media_type="application/json")
+    content = cache["listings"].get(("json", type or ""))
+    if content is None:
+        content = orjson.dumps(_list_summaries(cache, type))
+        cache["listings"][("json", type or "")] = content
+    return Response(content=content, media_type="application/json")
 
 
 @app.post(
@@ -149,19 +323,14 @@ async def query_menu(
     - **place_name**: 店家名稱（必填）
     """
     try:
-        data = payload.model_dump()
-        query_name = data.get("place_name")
+        query_name = payload.place_name
         if not query_name:
             raise HTTPException(status_code=400, detail="place_name is required")
-        with open(places_path, "r", encoding="utf-8") as file:
-            places_data = json.load(file)
-        for place in places_data:
-            if place["name"] == query_name:
-                return {"菜單": place["menu"]}
-            else:
-                continue
-        return {"狀態": "您尋找的餐廳未被登錄"}
-    except json.JSONDecodeError:
+        place = (await _load_places())["places"].get(query_name)
+        if place is None:
+            return {"狀態": "您尋找的餐廳未被登錄"}
+        return {"菜單": place["menu"]}
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON format")
 
 @app.post(
@@ -209,30 +378,31 @@ async def create_place(
     - **menu**: 菜單列表(選填), 格式為List of dicts, key 為品項名稱, value 為價格
     """
     try:
-        async with locked_file_operation("r") as file:
-            places_data = json.load(file)
-        # Check Repeat
-        for place in places_data:
-            if place["name"] == new_place.name:
+        cache = await _load_places()
+        # 檢查、寫入日誌與更新快取都在同一把鎖內完成，日誌寫入成功後才更新快取
+        async with _write_lock:
+            places = cache["places"]
+            # Check Repeat
+            if new_place.name in places:
                 raise HTTPException(status_code=400, detail="Your place is repeated.")
-        # Get Latest ID
-        if places_data:
-            last_id = places_data[-1]["id"]
-        else:
-            last_id = 0
-        new_id = last_id + 1
-        # Create New Place
-        new_place_dict = new_place.model_dump()
-        # Re-Order
-        ordered_dict = OrderedDict()
-        ordered_dict["id"] = new_id
-        for key, value in new_place_dict.items():
-            ordered_dict[key] = value
-        # Insert New Place
-        places_data.append(ordered_dict)
-        async with locked_file_operation("w") as file:
-            json.dump(places_data, file, indent=4, ensure_ascii=False)
-        return {"message": "Place created successfully", "new_place": ordered_dict}
+            # Get Latest ID
+            new_id = cache["max_id"] + 1
+            # Create New Place, id 放在第一個欄位
+            new_place_dict = {
+                "id": new_id,
+                "name": new_place.name,
+                "type": new_place.type,
+                "specialty": new_place.specialty,
+                "menu": [item.root for item in new_place.menu] if new_place.menu is not None else None,
+            }
+            await _append_op({"op": "add", "place": new_place_dict})
+            # Insert New Place
+            places[new_place.name] = new_place_dict
+            cache["summaries"][new_place.name] = _summarize(new_place_dict)
+            cache["listings"].clear()
+            cache["by_type"].setdefault(new_place.type, []).append(new_place.name)
+            cache["max_id"] = new_id
+        return {"message": "Place created successfully", "new_place": new_place_dict}
     except HTTPException as errmsg:
         raise errmsg
     except Exception as errmsg:
@@ -272,30 +442,21 @@ async def update_menu(
     - **updated_menu**: 新菜單列表(必填), 格式為List of dicts, key 為品項名稱, value 為價格
     """
     try:
-        data = payload.model_dump()
-        place_name = data.get("place_name")
-        updated_menu = data.get("updated_menu")
+        place_name = payload.place_name
+        updated_menu = [item.root for item in payload.updated_menu]
         if not place_name:
             raise HTTPException(status_code=400, detail="place_name is required")
-        if updated_menu is None:
-            raise HTTPException(status_code=400, detail="updated_menu is required")
-
-        async with locked_file_operation("r") as file:
-            places_data = json.load(file)
-
-        found = False
-        for place in places_data:
-            if place["name"] == place_name:
-                place["menu"] = updated_menu
-                found = True
-                break
-        if not found:
-            raise HTTPException(status_code=404, detail="Place not found")
-
-        async with locked_file_operation("w") as file:
-            json.dump(places_data, file, indent=4, ensure_ascii=False)
+
+        cache = await _load_places()
+
+        async with _write_lock:
+            place = cache["places"].get(place_name)
+            if place is None:
+                raise HTTPException(status_code=404, detail="Place not found")
+            await _append_op({"op": "update_menu", "name": place_name, "menu": updated_menu})
+            place["menu"] = updated_menu
         return {"message": "Menu updated successfully"}
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON format")
     except Exception as err:
         raise HTTPException(status_code=500, detail=str(err))
@@ -324,28 +485,23 @@ async def delete_place(
     - **place_name**: 要刪除的餐廳或飲料店名稱 (必填)
     """
     try:
-        data = payload.model_dump()
-        place_name = data.get("place_name")
+        place_name = payload.place_name
         if not place_name:
             raise HTTPException(status_code=400, detail="place_name is required")
         
-        async with locked_file_operation("r") as file:
-            places_data = json.load(file)
-
-        found = False
-        for _, place in enumerate(places_data):
-            if place["name"] == place_name:
-                del places_data[_]
-                found = True
-                break
-
-        if not found:
-            raise HTTPException(status_code=404, detail="Place not found")
-
-        async with locked_file_operation("w") as file:
-            json.dump(places_data, file, indent=4, ensure_ascii=False)
+        cache = await _load_places()
+
+        async with _write_lock:
+            places = cache["places"]
+            if place_name not in places:
+                raise HTTPException(status_code=404, detail="Place not found")
+            await _append_op({"op": "delete", "name": place_name})
+            deleted = places.pop(place_name)
+            del cache["summaries"][place_name]
+            cache["listings"].clear()
+            cache["by_type"][deleted["type"]].remove(place_name)
         return {"message": "Place deleted successfully"}
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON format")
     except Exception as err:
         raise HTTPException(status_code=500, detail=str(err))
@@ -381,21 +537,19 @@ async def random_place(
       - 'drink': 從飲料店中隨機選擇
     """
     try:
-        data = payload.model_dump()
-        place_type = data.get("type")
+        place_type = payload.type
         if not place_type:
             raise HTTPException(status_code=400, detail="type is required")
         
-        async with locked_file_operation("r") as file:
-            places_data = json.load(file)
+        cache = await _load_places()
 
-        filtered_places = [place for place in places_data if place["type"] == place_type]
-        if not filtered_places:
+        names = cache["by_type"].get(place_type)
+        if not names:
             raise HTTPException(status_code=404, detail="No places found with the specified type")
 
-        random_place = random.choice(filtered_places)
+        random_place = cache["places"][random.choice(names)]
         return {"random_place": random_place}
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON format")
     except Exception as err:
         raise HTTPException(status_code=500, detail=str(err))
@@ -408,39 +562,39 @@ async def random_place(
         tags={"catalog", "randomizer"})
 async def mcp_draw_gourmet(payload: str):
     try:
-        data = json.loads(payload)
+        data = orjson.loads(payload)
     except Exception as err:
       raise HTTPException(status_code=400, detail=str(err))
-    async with httpx.AsyncClient() as client:
-        response = await client.post("http://10.13.60.113:8081/random_place", json=data)
-        if response.status_code == 200:
-            return f"response_text: {response.json()}"
-        else:  
-            print(f"Error: Received status code {response.status_code}")  
-        return {"error": "Failed to Draw Shop."}  
-    
+    try:
+        return f"response_text: {await random_place(PlaceType.model_validate(data))}"
+    except (HTTPException, ValidationError) as err:
+        print(f"Error: {err}")
+    return {"error": "Failed to Draw Shop."}
+
 @mcp.tool(
         title="美食店家清單",
         name="mcp_get_gourmet_list", # Please note that this will override the function name.
         description="Help users to get restaurant list or drink shop list. To Call mcp_get_gourmet_list, you need to input a single string from food or drink, any other strings are invalid input which will cause error.",
         tags={"catalog", "retriever"})
 async def mcp_get_gourmet_list(payload: str = None):
+    place_type = None
     if payload:
         if "food" in payload:
-            place_url = f"http://10.13.60.113:8081/get_places?type=food"
+            place_type = "food"
         elif "drink" in payload:
-            place_url = f"http://10.13.60.113:8081/get_places?type=drink"
+            place_type = "drink"
         else:
-            place_url = "http://10.13.60.113:8081/get_places"
-    else:
-        place_url = "http://10.13.60.113:8081/get_places"
-    async with httpx.AsyncClient() as client:
-        response = await client.get(place_url)
-        if response.status_code == 200:  
-            return f"response_text: {response.json()}"
-        else:  
-            print(f"Error: Received status code {response.status_code}")  
-        return {"error": "Failed to retrieve shop list."}  
+            raise HTTPException(status_code=400, detail="type must be food or drink")
+    try:
+        cache = await _load_places()
+        text = cache["listings"].get(("text", place_type or ""))
+        if text is None:
+            text = f"response_text: {_list_summaries(cache, place_type)}"
+            cache["listings"][("text", place_type or "")] = text
+        return text
+    except (OSError, orjson.JSONDecodeError) as err:
+        print(f"Error: {err}")
+    return {"error": "Failed to retrieve shop list."}
 
 @mcp.tool(
         title="查詢餐廳菜單",
@@ -449,16 +603,14 @@ async def mcp_get_gourmet_list(payload: str = None):
         tags={"catalog", "retriever"})
 async def mcp_query_menu(payload: str):
     try:
-        data = json.loads(payload)
+        data = orjson.loads(payload)
     except Exception as err:
       raise HTTPException(status_code=400, detail=str(err))
-    async with httpx.AsyncClient() as client:
-        response = await client.post("http://10.13.60.113:8081/query_menu", json=data)
-        if response.status_code == 200:  
-            return f"response_text: {response.json()}"
-        else:  
-            print(f"Error: Received status code {response.status_code}")  
-        return {"error": "Failed to query menu."}  
+    try:
+        return f"response_text: {await query_menu(PlaceName.model_validate(data))}"
+    except (HTTPException, ValidationError) as err:
+        print(f"Error: {err}")
+    return {"error": "Failed to query menu."}
 
 @mcp.tool(
         title="新增餐廳",
@@ -467,16 +619,14 @@ async def mcp_query_menu(payload: str):
         tags={"catalog", "creator"})
 async def mcp_add_gourmet_shop(payload: str):
     try:
-        data = json.loads(payload)
+        data = orjson.loads(payload)
     except Exception as err:
       raise HTTPException(status_code=400, detail=str(err))
-    async with httpx.AsyncClient() as client:
-        response = await client.post("http://10.13.60.113:8081/create_place", json=data)
-        if response.status_code == 200:  
-            return f"response_text: {response.json()}"
-        else:  
-            print(f"Error: Received status code {response.status_code}")  
-        return {"error": "Failed to add shop."}  
+    try:
+        return f"response_text: {await create_place(NewPlace.model_validate(data))}"
+    except (HTTPException, ValidationError) as err:
+        print(f"Error: {err}")
+    return {"error": "Failed to add shop."}
 
 @mcp.tool(
         title="更新餐廳菜單",
@@ -485,20 +635,14 @@ async def mcp_add_gourmet_shop(payload: str):
         tags={"catalog", "updater"})
 async def mcp_update_menu(payload: str):
     try:
-        data = json.loads(payload)
+        data = orjson.loads(payload)
     except Exception as err:
       raise HTTPException(status_code=400, detail=str(err))
-    async with httpx.AsyncClient() as client:
-        response = await client.request(
-            method="PUT",
-            url="http://10.13.60.113:8081/update_menu",
-            json=data
-        )
-        if response.status_code == 200:  
-            return f"response_text: {response.json()}"
-        else:  
-            print(f"Error: Received status code {response.status_code}")  
-        return {"error": "Failed to update menu."}  
+    try:
+        return f"response_text: {await update_menu(UpdateMenu.model_validate(data))}"
+    except (HTTPException, ValidationError) as err:
+        print(f"Error: {err}")
+    return {"error": "Failed to update menu."}
 
 @mcp.tool(
         title="刪除餐廳",
@@ -507,22 +651,29 @@ async def mcp_update_menu(payload: str):
         tags={"catalog", "deleter"})
 async def mcp_delete_gourmet_shop(payload: str):
     try:
-        data = json.loads(payload)
+        data = orjson.loads(payload)
     except Exception as err:
       raise HTTPException(status_code=400, detail=str(err))
-    async with httpx.AsyncClient() as client:
-        response = await client.request(
-            method="DELETE",
-            url="http://10.13.60.113:8081/delete_place",
-            json=data
-        )
-        if response.status_code == 200:  
-            return f"response_text: {response}"
-        else:  
-            print(f"Error: Received status code {response.status_code}")  
-        return {"error": "Failed to delete shop."}  
+    try:
+        return f"response_text: {await delete_place(PlaceName.model_validate(data))}"
+    except (HTTPException, ValidationError) as err:
+        print(f"Error: {err}")
+    return {"error": "Failed to delete shop."}
 
 # MCP 測試用
+# 測試工具的回應固定不變，於 import 時組好字串直接回傳
+_KBTEST01_RESPONSE = "response_text: " + str({
+    "text_id": "kbtest_001",
+    "text": "您所查詢的信用卡發卡案件編號是TEST20250901。"
+})
+_KBTEST02_RESPONSE = "response_text: " + str({
+    "text_id": "kbtest_002",
+    "text": "您查詢的貸款案件TEST20250901目前的狀態是正在審核客戶資料中。"
+})
+_KBTEST03_RESPONSE = "response_text: " + str({
+    "text_id": "kbtest_003",
+    "text": "您查詢的待審案件TEST20250901已審核通過。"
+})
 
 @mcp.tool(
         title="查詢向量資料庫KBTEST01",
@@ -530,11 +681,7 @@ async def mcp_delete_gourmet_shop(payload: str):
         description="Query Vector Store KBTEST01, the store contains all the data from creditcard department.",
         tags={"catalog", "retriever"})
 async def mcp_retrieve_kbtest01():
-    response = {
-        "text_id": "kbtest_001",
-        "text": "您所查詢的信用卡發卡案件編號是TEST20250901。"
-    }
-    return f"response_text: {response}"
+    return _KBTEST01_RESPONSE
 
 @mcp.tool(
         title="查詢向量資料庫KBTEST02",
@@ -542,11 +689,7 @@ async def mcp_retrieve_kbtest01():
         description="Query Vector Store KBTEST02, the store contains all the data from corporate banking department.",
         tags={"catalog", "retriever"})
 async def mcp_retrieve_kbtest02():
-    response = {
-        "text_id": "kbtest_002",
-        "text": "您查詢的貸款案件TEST20250901目前的狀態是正在審核客戶資料中。"
-    }
-    return f"response_text: {response}"
+    return _KBTEST02_RESPONSE
 
 @mcp.tool(
         title="查詢向量資料庫KBTEST03",
@@ -554,11 +697,7 @@ async def mcp_retrieve_kbtest02():
         description="Query Vector Store KBTEST03, the store contains all the data from audit department.",
         tags={"catalog", "retriever"})
 async def mcp_retrieve_kbtest03():
-    response = {
-        "text_id": "kbtest_003",
-        "text": "您查詢的待審案件TEST20250901已審核通過。"
-    }
-    return f"response_text: {response}"
+    return _KBTEST03_RESPONSE
 
 # Mounting MCP to FastAPI
 mcp_app = mcp.http_app(transport="streamable-http")
@@ -566,9 +705,22 @@ routes = [
     *mcp_app.routes,
     *app.routes
 ]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 啟動時讀取主檔並重播日誌
+    await _load_places()
+    async with mcp_app.lifespan(app):
+        yield
+    # 關閉前等待背景壓縮完成，再將剩餘日誌併入主檔
+    await asyncio.gather(*_background_tasks)
+    cache = await _load_places()
+    if cache["journal"]:
+        await _save_places(cache["places"])
+
 mcp_gourmet = FastAPI(
     routes=routes,
-    lifespan=mcp_app.lifespan,
+    lifespan=lifespan,
 )
 
 mcp_gourmet.add_middleware(
@@ -580,4 +732,12 @@ mcp_gourmet.add_middleware(
 )
 
 if __name__ == "__main__":
-    uvicorn.run(mcp_gourmet, host="0.0.0.0", port=8081)
\ No newline at end of file
+    uvicorn.run(
+        # 多個 worker 時 uvicorn 需要以 import 字串載入，請在專案根目錄以 python -m tools.mcp_gourmet 執行
+        "tools.mcp_gourmet:mcp_gourmet" if MCP_GOURMET_WORKERS > 1 else mcp_gourmet,
+        host="0.0.0.0",
+        port=8081,
+        workers=MCP_GOURMET_WORKERS,
+        loop="uvloop",
+        http="httptools"
+    )
\ No newline at end of file
@@ -1,4 +1,6 @@
+import asyncio
 from contextlib import asynccontextmanager
+from cachetools import LRUCache
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
 import litellm
@@ -14,6 +16,17 @@ COLLECTION_NAME = "your_collection_name" # 請替換為你的 collection 名稱
 LITELLM_API_BASE = "http://your-litellm-api-base-url" # 替換為你的 LiteLLM API 位址
 LITELLM_MODEL = "qwen-embedding" # 替換為你的 qwen embedding 模型名稱
 
+# 在 EMBED_BATCH_WINDOW 秒內抵達的查詢會合併成一次 embedding 呼叫
+EMBED_BATCH_WINDOW = 0.005
+# 等待 embedding 結果的上限秒數
+EMBED_TIMEOUT = 30
+# 佇列與 batcher 在第一次 _embed 時於當下的 event loop 建立，
+# 經由 FastMCP.from_fastapi 呼叫時不會執行 lifespan，不能只靠 lifespan 啟動
+_batcher = {"loop": None, "queue": None, "task": None}
+_batch_tasks = set()
+# 相同查詢直接沿用先前的 embedding，不再呼叫 LiteLLM
+_EMBED_CACHE = LRUCache(maxsize=4096)
+
 class SearchRequest(BaseModel):
     query: str = Field(..., description="User's text query for vector search.")
     top_k: int = Field(10, gt=0, description="The number of most similar results to return.")
@@ -21,6 +34,62 @@ class SearchRequest(BaseModel):
 class SearchResponse(BaseModel):
     results: list = Field(..., description="List of search results.")
 
+async def _embed_batch(items: list):
+    try:
+        response = await litellm.get_embedding_async(
+            model=LITELLM_MODEL,
+            input=[query for query, _ in items],
+            api_base=LITELLM_API_BASE
+        )
+        if not response or not response.data or len(response.data) != len(items):
+            raise HTTPException(status_code=500, detail="Failed to get embedding from LiteLLM.")
+        for (_, future), item in zip(items, response.data):
+            if not future.done():
+                future.set_result(item.embedding)
+    except Exception as e:
+        for _, future in items:
+            if not future.done():
+                future.set_exception(e)
+
+async def _embedding_batcher(queue: asyncio.Queue):
+    """
+    Drain the queue and embed every query collected within EMBED_BATCH_WINDOW in one call.
+    """
+    while True:
+        items = [await queue.get()]
+        await asyncio.sleep(EMBED_BATCH_WINDOW)
+        try:
+            while True:
+                items.append(queue.get_nowait())
+        except asyncio.QueueEmpty:
+            pass
+        # 交給獨立的 task 處理，等待回應的同時繼續收集下一批
+        task = asyncio.create_task(_embed_batch(items))
+        _batch_tasks.add(task)
+        task.add_done_callback(_batch_tasks.discard)
+
+def _ensure_batcher() -> asyncio.Queue:
+    loop = asyncio.get_running_loop()
+    task = _batcher["task"]
+    if _batcher["loop"] is not loop or task is None or task.done():
+        queue = asyncio.Queue()
+        _batcher.update(loop=loop, queue=queue, task=loop.create_task(_embedding_batcher(queue)))
+    return _batcher["queue"]
+
+async def _stop_batcher():
+    task = _batcher["task"]
+    if task is not None and not task.done():
+        task.cancel()
+    _batcher.update(loop=None, queue=None, task=None)
+
+async def _embed(query: str) -> list:
+    embedding = _EMBED_CACHE.get(query)
+    if embedding is None:
+        future = asyncio.get_running_loop().create_future()
+        _ensure_batcher().put_nowait((query, future))
+        embedding = _EMBED_CACHE[query] = await asyncio.wait_for(future, EMBED_TIMEOUT)
+    return embedding
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -33,7 +102,12 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"Failed to connect to Milvus or find collection: {e}")
         raise RuntimeError("Failed to start application due to Milvus connection error.")
-    
+    _ensure_batcher()
+    try:
+        yield
+    finally:
+        await _stop_batcher()
+
 app = FastAPI(
     title="Milvus Vector Search API",
     description="An API for performing vector similarity search on Milvus.",
@@ -45,17 +119,8 @@ app = FastAPI(
 async def search(request: SearchRequest):
 
     try:
-        # 1. 使用 LiteLLM 獲取使用者查詢的 embedding
-        response = await litellm.get_embedding_async(
-            model=LITELLM_MODEL,
-            input=[request.query],
-            api_base=LITELLM_API_BASE
-        )
-        
-        if not response or not response.data:
-            raise HTTPException(status_code=500, detail="Failed to get embedding from LiteLLM.")
-        
-        query_vector = [item.embedding for item in response.data]
+        # 1. 使用 LiteLLM 獲取使用者查詢的 embedding (與同時段的其他查詢合併送出)
+        query_vector = [await _embed(request.query)]
 
         # 2. 在 Milvus 中進行向量搜尋
         search_results = MILVUS_CLIENT.search_vectors(
@@ -68,13 +133,8 @@ async def search(request: SearchRequest):
             raise HTTPException(status_code=500, detail="Milvus search failed.")
             
         # 3. 處理並回傳結果
-        formatted_results = []
-        for hit in search_results[0]:
-            formatted_results.append({
-                "id": hit['id'],
-                "distance": hit['distance']
-            })
-            
+        formatted_results = [{"id": hit['id'], "distance": hit['distance']} for hit in search_results[0]]
+
         return {"results": formatted_results}
 
     except litellm.APIError as e:
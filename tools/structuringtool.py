@@ -1,5 +1,5 @@
 # 用於將非結構化資料轉換成JSON格式，以便後續關卡需要JSON輸入時使用
-import json
+import orjson
 from typing import Dict, Any
 from fastmcp import FastMCP
 
@@ -11,7 +11,7 @@ def structured_data_converting(generated_content):
     Converts a natural language prompt into a structured JSON object based on a provided API schema.
     """
     try:
-        structured_data = json.loads(generated_content)
+        structured_data = orjson.loads(generated_content)
         return structured_data
 
     except Exception as e:
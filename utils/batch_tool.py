@@ -0,0 +1,54 @@
+"""Batch meta-tool for ADK agents.
+
+模型常常一次只呼叫一個工具，batch 讓模型在同一輪中把多個工具呼叫打包送出，
+由伺服器端並行執行後一次回傳所有結果。
+每個呼叫都走 ADK 原本的 functions.handle_function_call_list_async，
+before/after/on_error tool callback 與 utils.parallel_tools 的並行限制都照常套用。
+"""
+import asyncio
+from google.adk.flows.llm_flows import functions
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+BATCH_TOOL_NAME = "batch"
+
+async def _invoke(invocation_context, tools_dict: dict, invocation: dict, tool_context: ToolContext) -> dict:
+    tool_name = invocation.get("tool_name")
+    try:
+        function_call = types.FunctionCall(
+            id=functions.generate_client_function_call_id(),
+            name=tool_name,
+            args=invocation.get("args") or {},
+        )
+        event = await functions.handle_function_call_list_async(invocation_context, [function_call], tools_dict)
+    except Exception as err:
+        return {"tool_name": tool_name, "error": str(err)}
+    if event is None:
+        # long running 工具可以不回傳結果
+        return {"tool_name": tool_name, "result": None}
+    # 子呼叫寫入的 state / artifact 併入 batch 自己的事件，才會被 session 保存
+    functions.deep_merge_dicts(tool_context.actions.state_delta, event.actions.state_delta)
+    tool_context.actions.artifact_delta.update(event.actions.artifact_delta)
+    return {"tool_name": tool_name, "result": event.content.parts[0].function_response.response}
+
+async def batch(invocations: list[dict], tool_context: ToolContext) -> list[dict]:
+    """
+    Runs several independent tool calls at once and returns all of their results.
+
+    Args:
+        invocations: Tool calls to run concurrently, e.g.
+            [{"tool_name": "get_system_time", "args": {}},
+             {"tool_name": "mcp_get_gourmet_list", "args": {"payload": "food"}}].
+    Returns:
+        list[dict]: One entry per invocation in the same order, holding either "result" or "error".
+    """
+    # handle_function_call_list_async 需要 InvocationContext，ToolContext 沒有公開的存取方式
+    invocation_context = tool_context._invocation_context
+    tools_dict = {
+        tool.name: tool
+        for tool in await invocation_context.agent.canonical_tools(tool_context)
+        if tool.name != BATCH_TOOL_NAME
+    }
+    return await asyncio.gather(
+        *[_invoke(invocation_context, tools_dict, invocation, tool_context) for invocation in invocations]
+    )
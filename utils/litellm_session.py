@@ -0,0 +1,35 @@
+"""Process-wide httpx client shared by every LiteLLM backend.
+
+LiteLLM 預設每個 client 各自建立連線，這裡讓同一個 process 內所有 agent 共用同一組
+keep-alive + HTTP/2 連線池，避免每輪 LLM 呼叫都重新進行 TCP/TLS 握手。
+"""
+from typing import Optional
+import httpx
+import litellm
+
+# 第一次 install_shared_httpx() 時才建立，不使用 LiteLLM 的 process 不會開連線池
+_shared_httpx: Optional[httpx.AsyncClient] = None
+
+def install_shared_httpx() -> httpx.AsyncClient:
+    """
+    Create the shared client if needed and route LiteLLM async requests through it.
+    """
+    global _shared_httpx
+    if _shared_httpx is None:
+        _shared_httpx = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        )
+    litellm.aclient_session = _shared_httpx
+    return _shared_httpx
+
+async def close_shared_httpx() -> None:
+    """
+    Close the shared client on application shutdown, no-op if it was never created.
+    """
+    global _shared_httpx
+    if _shared_httpx is None:
+        return
+    client, _shared_httpx = _shared_httpx, None
+    await client.aclose()
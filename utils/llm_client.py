@@ -1,12 +1,161 @@
 #%%
 import os
-import ollama
-import openai
+import sys
+import copy
+import asyncio
+import hashlib
+import orjson
 import yaml
+from cachetools import LRUCache
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 from utils import response_schema
 from dotenv import load_dotenv
-from google import genai
-from google.genai import types
+# google.genai、ollama、openai 載入很慢，延後到實際建立對應 client 時才 import
+# 優先使用 LibYAML 的 C 實作
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+load_dotenv(".env")
+GCP_API_KEY = os.getenv("GCP_API_KEY")
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434")
+# 設定後改經由 unix socket 連線到本機 Ollama
+OLLAMA_SOCKET = os.getenv("OLLAMA_SOCKET")
+LLM_RESPONSE_CACHE_SIZE = int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "1024"))
+# Gemini 單一請求最多可回傳的 candidate 數
+MAX_CANDIDATE_COUNT = 8
+
+# 以 (路徑, mtime, 檔案大小) 為 key 快取解析結果，檔案被修改後會自動重新解析
+# 解析後另存一份 <path>.json，其他 process 只要 JSON 檔不比 YAML 舊就直接讀 JSON
+@lru_cache(maxsize=100)
+def _parse_yaml(path, mtime_ns, size):
+    sidecar_path = path + ".json"
+    try:
+        if os.stat(sidecar_path).st_mtime_ns >= mtime_ns:
+            with open(sidecar_path, 'rb') as file:
+                return orjson.loads(file.read())
+    except (OSError, orjson.JSONDecodeError):
+        pass
+    with open(path, 'rb') as file:
+        data = yaml.load(file, Loader=_YamlLoader)
+    # 先寫入暫存檔再 rename，避免其他 process 讀到寫到一半的檔案
+    tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as file:
+            file.write(orjson.dumps(data))
+        os.replace(tmp_path, sidecar_path)
+    except (OSError, TypeError):
+        pass
+    return data
+
+def _load_yaml(path):
+    stat = os.stat(path)
+    return _parse_yaml(path, stat.st_mtime_ns, stat.st_size)
+
+# 只有逾時、限流與伺服器端錯誤才重試，其餘錯誤直接回傳給呼叫端
+RETRY_STATUS_CODES = [408, 429, 500, 502, 503, 504]
+
+def _is_transient(err):
+    import httpx
+    import ollama
+    if isinstance(err, ollama.ResponseError):
+        return err.status_code in RETRY_STATUS_CODES
+    return isinstance(err, (httpx.TimeoutException, TimeoutError))
+
+_retry_transient = retry(
+    retry=retry_if_exception(_is_transient),
+    wait=wait_exponential_jitter(initial=0.5, max=8),
+    stop=stop_after_attempt(4),
+    reraise=True,
+)
+
+# 相同的模型、參數與輸入直接回傳先前的 response，不再呼叫模型
+_RESPONSE_CACHE = LRUCache(maxsize=LLM_RESPONSE_CACHE_SIZE)
+
+def _response_cache_key(cache, config_data:dict, tool_use, *parts):
+    """
+    回傳 response 快取的 key，不使用快取時回傳 None。
+    cache 為 None 時只有 temperature 為 0 且沒有使用工具時才快取，True/False 則強制開關。
+    """
+    if cache is None:
+        cache = config_data["temperature"] == 0 and tool_use is None
+    if not cache:
+        return None
+    try:
+        return hashlib.blake2b(
+            orjson.dumps([config_data, _tool_key(tool_use), *parts], option=orjson.OPT_SORT_KEYS),
+            digest_size=16,
+        ).digest()
+    except TypeError:
+        return None
+
+def _tool_key(tool_use):
+    # 工具的宣告內容決定模型看到的工具，以此區分不同工具的快取
+    if tool_use is None:
+        return None
+    if hasattr(tool_use, "model_dump"):
+        return tool_use.model_dump(mode="json", exclude_none=True)
+    if callable(tool_use):
+        return f"{tool_use.__module__}.{tool_use.__qualname__}"
+    return tool_use
+
+def _select_schema(schema_name):
+    # response_schema 載入時已產生好所有 schema
+    return response_schema.JSON_SCHEMAS[schema_name]
+
+# 同一組生成參數、system prompt、工具與 schema 共用同一個 GenerateContentConfig
+_GEN_CONFIGS = {}
+_GEN_CONFIGS_MAXSIZE = 128
+
+def _build_gen_config(config_data:dict, system_prompt:str, tool_use=None, schema_class=None):
+    # Tool 物件無法 hash，以 id 當 key，命中時再確認是同一個物件
+    # system_prompt 由 select_prompt 取得時已 intern，比對 key 時直接命中同一個物件
+    key = (
+        config_data["temperature"],
+        config_data["top_p"],
+        config_data["max_output_tokens"],
+        config_data["frequency_penalty"],
+        system_prompt,
+        id(tool_use),
+        schema_class,
+    )
+    cached = _GEN_CONFIGS.get(key)
+    if cached is not None and cached[0] is tool_use:
+        return cached[1]
+    from google.genai import types
+    if tool_use == None:
+        tool_options = []
+    else:
+        tool_options = [tool_use]
+    if schema_class is None:
+        config = types.GenerateContentConfig(
+            response_mime_type="text/plain",
+            system_instruction=system_prompt,
+            temperature=config_data["temperature"],
+            top_p=config_data["top_p"],
+            max_output_tokens=config_data["max_output_tokens"],
+            frequency_penalty=config_data["frequency_penalty"],
+            tools=tool_options,
+            response_modalities=["TEXT"]
+            )
+    else:
+        config = types.GenerateContentConfig(
+            response_mime_type="application/json",
+            system_instruction=system_prompt,
+            temperature=config_data["temperature"],
+            top_p=config_data["top_p"],
+            max_output_tokens=config_data["max_output_tokens"],
+            frequency_penalty=config_data["frequency_penalty"],
+            tools=tool_options,
+            response_schema=list[schema_class]
+            )
+    if len(_GEN_CONFIGS) >= _GEN_CONFIGS_MAXSIZE:
+        _GEN_CONFIGS.clear()
+    _GEN_CONFIGS[key] = (tool_use, config)
+    return config
 
 class GeminiClient:
 
@@ -14,77 +163,149 @@ class GeminiClient:
         """
         Documentation: https://ai.google.dev/gemini-api/docs?hl=zh-tw
         """
-        load_dotenv(".env")
+        import httpx
+        from google import genai
+        from google.genai import types
+        self._types = types
         self.config_path = "llm_config.yaml"
         self.prompt_path = "prompts.yaml"
-        self.client = genai.Client(api_key=os.getenv("GCP_API_KEY"))
+        # 同一個 client 內的請求共用 keep-alive + HTTP/2 連線池
+        self.client = genai.Client(
+            api_key=GCP_API_KEY,
+            http_options=types.HttpOptions(
+                client_args={
+                    "http2": True,
+                    "limits": httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                },
+                retry_options=types.HttpRetryOptions(
+                    attempts=4,
+                    initial_delay=0.5,
+                    max_delay=8,
+                    http_status_codes=RETRY_STATUS_CODES,
+                ),
+            ),
+        )
 
     def select_config(self, config_key):
-        with open(self.config_path, 'r', encoding="utf-8") as file:
-            config = yaml.load(file, Loader=yaml.FullLoader)[config_key]
-        return config
+        # 快取中的設定為所有呼叫端共用，回傳複本避免被呼叫端修改
+        return copy.deepcopy(_load_yaml(self.config_path)[config_key])
     
     def select_prompt(self, prompt_key):
-        with open(self.prompt_path, 'r', encoding="utf-8") as file:
-            system_prompt = yaml.load(file, Loader=yaml.FullLoader)[prompt_key]
-        return system_prompt
+        return sys.intern(_load_yaml(self.prompt_path)[prompt_key])
     
+    @staticmethod
     def select_schema(schema_name):
-        schema_class = getattr(response_schema, schema_name)
-        schema_dict = schema_class.model_json_schema()
-        result_schema = {
-            "type": schema_dict["type"],
-            "properties": schema_dict["properties"],
-            "required": schema_dict["required"]
-        }
-        return result_schema
+        return _select_schema(schema_name)
     
+    @cached_property
+    def _tool_cache(self):
+        types = self._types
+        return {
+            "exe_code": types.Tool(code_execution=types.ToolCodeExecution),
+            "get_urlpage": types.Tool(url_context=types.UrlContext),
+            "web_search": types.Tool(google_search=types.GoogleSearch),
+        }
+
     def select_tools(self, tool_name):
-        match tool_name:
-            case "exe_code":
-                tool_option = types.Tool(code_execution=types.ToolCodeExecution)
-            case "get_urlpage":
-                tool_option = types.Tool(url_context=types.UrlContext)
-            case "web_search":
-                tool_option = types.Tool(google_search=types.GoogleSearch)
-            case _:
-                tool_option = None
-        return tool_option
+        return self._tool_cache.get(tool_name)
     
-    def generate_text(self, model:str, config_data:dict, system_prompt:str, user_query:str, tool_use:str=None):
+    def _user_contents(self, text:str):
+        # 直接建構 Part 比 Part.from_text 少一層 classmethod 呼叫
+        return [self._types.Content(role="user", parts=[self._types.Part(text=text)])]
+
+    def generate_text(self, model:str, config_data:dict, system_prompt:str, user_query:str, tool_use:str=None, cache:bool=None):
         """
         用於單次推論文字生成，模型會進行單次生成
         """
-        if tool_use == None:
-            tool_options = []
-        else:
-            tool_options = [tool_use]
-        config = types.GenerateContentConfig(
-            response_mime_type="text/plain",
-            system_instruction=system_prompt,
-            temperature=config_data["temperature"],
-            top_p=config_data["top_p"],
-            max_output_tokens=config_data["max_output_tokens"],
-            frequency_penalty=config_data["frequency_penalty"],
-            tools=tool_options,
-            response_modalities=["TEXT"]
-            )
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_text(text=user_query),
-                ],
-            )]
+        config = _build_gen_config(config_data, system_prompt, tool_use)
+        contents = self._user_contents(user_query)
+        key = _response_cache_key(cache, config_data, tool_use, "gemini", model, system_prompt, user_query)
+        response = _RESPONSE_CACHE.get(key) if key is not None else None
+        if response is not None:
+            return None, response
         try:
             response = self.client.models.generate_content(model=model, contents=contents, config=config)
+            if key is not None:
+                _RESPONSE_CACHE[key] = response
             errmsg = None
             return errmsg, response
         except Exception as errmsg:
             response = None
             return errmsg, response
 
-    def generate_structured_text(self, model:str, config_data:dict, system_prompt:str, user_query:str, tool_use:str=None, schema_name:str=None):
+    async def agenerate_text(self, model:str, config_data:dict, system_prompt:str, user_query:str, tool_use:str=None, cache:bool=None):
+        """
+        generate_text 的非同步版本
+        """
+        config = _build_gen_config(config_data, system_prompt, tool_use)
+        contents = self._user_contents(user_query)
+        key = _response_cache_key(cache, config_data, tool_use, "gemini", model, system_prompt, user_query)
+        response = _RESPONSE_CACHE.get(key) if key is not None else None
+        if response is not None:
+            return None, response
+        try:
+            response = await self.client.aio.models.generate_content(model=model, contents=contents, config=config)
+            if key is not None:
+                _RESPONSE_CACHE[key] = response
+            errmsg = None
+            return errmsg, response
+        except Exception as errmsg:
+            response = None
+            return errmsg, response
+
+    async def abatch_generate(self, jobs:list[dict]):
+        """
+        同時送出多筆 agenerate_text，jobs 中每個 dict 為 agenerate_text 的參數，依序回傳 (errmsg, response)
+        """
+        return await asyncio.gather(*(self.agenerate_text(**job) for job in jobs))
+
+    def _candidate_configs(self, config_data:dict, system_prompt:str, n:int, tool_use=None):
+        # 每個請求以 candidate_count 一次取回最多 MAX_CANDIDATE_COUNT 個結果
+        config = _build_gen_config(config_data, system_prompt, tool_use)
+        return [
+            config.model_copy(update={"candidate_count": min(MAX_CANDIDATE_COUNT, n - start)})
+            for start in range(0, n, MAX_CANDIDATE_COUNT)
+        ]
+
+    def generate_text_n(self, model:str, config_data:dict, system_prompt:str, user_query:str, n:int, tool_use:str=None):
+        """
+        同一個輸入產生 n 個結果，n 超過 MAX_CANDIDATE_COUNT 時分成多個請求並行送出，回傳 (errmsg, responses)
+        """
+        configs = self._candidate_configs(config_data, system_prompt, n, tool_use)
+        contents = self._user_contents(user_query)
+        try:
+            if len(configs) == 1:
+                responses = [self.client.models.generate_content(model=model, contents=contents, config=configs[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=len(configs)) as executor:
+                    responses = list(executor.map(
+                        lambda config: self.client.models.generate_content(model=model, contents=contents, config=config),
+                        configs,
+                    ))
+            errmsg = None
+            return errmsg, responses
+        except Exception as errmsg:
+            responses = None
+            return errmsg, responses
+
+    async def agenerate_text_n(self, model:str, config_data:dict, system_prompt:str, user_query:str, n:int, tool_use:str=None):
+        """
+        generate_text_n 的非同步版本
+        """
+        configs = self._candidate_configs(config_data, system_prompt, n, tool_use)
+        contents = self._user_contents(user_query)
+        try:
+            responses = await asyncio.gather(*(
+                self.client.aio.models.generate_content(model=model, contents=contents, config=config)
+                for config in configs
+            ))
+            errmsg = None
+            return errmsg, list(responses)
+        except Exception as errmsg:
+            responses = None
+            return errmsg, responses
+
+    def generate_structured_text(self, model:str, config_data:dict, system_prompt:str, user_query:str, tool_use:str=None, schema_name:str=None, cache:bool=None):
         """
         用於單次推論結構化文字生成
         進階用法請參考 https://ai.google.dev/gemini-api/docs/structured-output?hl=zh-tw
@@ -95,101 +316,116 @@ class GeminiClient:
         except AttributeError:
             raise ValueError(f"Class '{schema_name}' not found in response_schema.py")
         #
-        if tool_use == None:
-            tool_options = []
-        else:
-            tool_options = [tool_use]
-        config = types.GenerateContentConfig(
-            response_mime_type="application/json",
-            system_instruction=system_prompt,
-            temperature=config_data["temperature"],
-            top_p=config_data["top_p"],
-            max_output_tokens=config_data["max_output_tokens"],
-            frequency_penalty=config_data["frequency_penalty"],
-            tools=tool_options,
-            response_schema=list[schema_class]
-            )
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_text(text=user_query),
-                ],
-            )]
+        config = _build_gen_config(config_data, system_prompt, tool_use, schema_class)
+        contents = self._user_contents(user_query)
+        key = _response_cache_key(cache, config_data, tool_use, "gemini", model, system_prompt, user_query, schema_name)
+        response = _RESPONSE_CACHE.get(key) if key is not None else None
+        if response is not None:
+            return None, response
         try:
             response = self.client.models.generate_content(model=model, contents=contents, config=config)
+            if key is not None:
+                _RESPONSE_CACHE[key] = response
             errmsg = None
             return errmsg, response
         except Exception as errmsg:
             response = None
             return errmsg, response
         
+    def parse_structured(self, response, schema_name:str=None):
+        """
+        解析 generate_structured_text 回傳的 JSON，指定 schema_name 時轉成對應的 response_schema 物件
+        """
+        data = orjson.loads(response.text)
+        if schema_name is None:
+            return data
+        schema_class = getattr(response_schema, schema_name)
+        return [schema_class.model_validate(item) for item in data]
+
+    def generate_text_stream(self, model:str, config_data:dict, system_prompt:str, user_query:str, tool_use:str=None):
+        """
+        generate_text 的串流版本，模型邊生成邊回傳 chunk，發生錯誤時直接拋出例外
+        """
+        config = _build_gen_config(config_data, system_prompt, tool_use)
+        contents = self._user_contents(user_query)
+        yield from self.client.models.generate_content_stream(model=model, contents=contents, config=config)
+
     def response_filter(self, response):
-        response_text = None
-        response_code = None
-        response_codeoutput = None
-        function_call_text = None
-        function_response_text = None
-        for part in response.candidates[0].content.parts:
-            if part.text is not None:
-                response_text = part.text
-            else:
-                pass
-            if part.executable_code:
-                if part.executable_code is not None:
-                    response_code = part.executable_code
-                else:
-                    pass
-            else:
-                pass
-            if part.code_execution_result:
-                if part.code_execution_result is not None:
-                    response_codeoutput = part.code_execution_result.output
-                else:
-                    pass
-            else:
-                pass
-            if part.function_call:
-                if part.function_call is not None:
-                    function_call_text = part.function_call
-                    if part.function_response is not None:
-                        function_response_text = part.function_response
-                    else:
-                        pass
-                else:
-                    pass
-            else:
-                pass
-        return response_text, response_code, response_codeoutput, function_call_text, function_response_text
+        """
+        收集所有 part 的內容，文字串接成一個字串，其餘欄位以 list 回傳，沒有內容時為 None
+        """
+        return self._filter_parts(response.candidates[0].content.parts)
+
+    def response_filter_stream(self, stream):
+        """
+        與 response_filter 相同，但彙整 generate_text_stream 回傳的所有 chunk
+        """
+        return self._filter_parts(
+            part
+            for chunk in stream
+            # 最後一個 chunk 可能只有 finish_reason 而沒有內容
+            if chunk.candidates and chunk.candidates[0].content and chunk.candidates[0].content.parts
+            for part in chunk.candidates[0].content.parts
+        )
+
+    @staticmethod
+    def _filter_parts(parts):
+        texts = []
+        codes = []
+        code_outputs = []
+        function_calls = []
+        function_responses = []
+        # 每個屬性只讀取一次
+        for part in parts:
+            text = part.text
+            if text is not None:
+                texts.append(text)
+            executable_code = part.executable_code
+            if executable_code:
+                codes.append(executable_code)
+            code_execution_result = part.code_execution_result
+            if code_execution_result:
+                code_outputs.append(code_execution_result.output)
+            function_call = part.function_call
+            if function_call:
+                function_calls.append(function_call)
+                function_response = part.function_response
+                if function_response is not None:
+                    function_responses.append(function_response)
+        response_text = "".join(texts) if texts else None
+        return response_text, codes or None, code_outputs or None, function_calls or None, function_responses or None
 
 class OllamaClient:
 
     def __init__(self) -> None:
         self.config_path = "llm_config.yaml"
         self.prompt_path = "prompts.yaml"
+        import httpx
+        import ollama
+        limits = httpx.Limits(max_keepalive_connections=8)
+        if OLLAMA_SOCKET:
+            client_args = {"transport": httpx.HTTPTransport(uds=OLLAMA_SOCKET, limits=limits)}
+            async_client_args = {"transport": httpx.AsyncHTTPTransport(uds=OLLAMA_SOCKET, limits=limits)}
+        else:
+            client_args = async_client_args = {"limits": limits}
+        self.client = ollama.Client(host=OLLAMA_HOST, **client_args)
+        self.async_client = ollama.AsyncClient(host=OLLAMA_HOST, **async_client_args)
+        # 串流不重試，避免重複送出已回傳的內容
+        self._chat = _retry_transient(self.client.chat)
+        self._achat = _retry_transient(self.async_client.chat)
 
     def select_config(self, config_key):
-        with open(self.config_path, 'r', encoding="utf-8") as file:
-            config = yaml.load(file, Loader=yaml.FullLoader)[config_key]
-        return config
+        # 快取中的設定為所有呼叫端共用，回傳複本避免被呼叫端修改
+        return copy.deepcopy(_load_yaml(self.config_path)[config_key])
     
     def select_schema(self, schema_name):
         if schema_name == None:
             return None
         else:
-            schema_class = getattr(response_schema, schema_name)
-            schema_dict = schema_class.model_json_schema()
-            result_schema = {
-                "type": schema_dict["type"],
-                "properties": schema_dict["properties"],
-                "required": schema_dict["required"]
-            }
-            return result_schema
+            return _select_schema(schema_name)
 
     def select_prompt(self, prompt_key):
-        with open(self.prompt_path, 'r', encoding="utf-8") as file:
-            system_prompt = yaml.load(file, Loader=yaml.FullLoader)[prompt_key]
-        return system_prompt
+        return sys.intern(_load_yaml(self.prompt_path)[prompt_key])
 
     def create_contents(self, system_prompt:str, user_query:str=None):
         messages=[{"role": "system", "content": system_prompt}]
@@ -200,7 +436,7 @@ class OllamaClient:
             messages.append(user_content)
             return messages
         
-    def chat(self, model:str, config_data:dict, messages:list, tool_use:str=None):
+    def _chat_kwargs(self, model:str, config_data:dict, messages:list, tool_use:str=None, schema_name:str=None):
         if tool_use == None:
             tool_options = []
         else:
@@ -211,58 +447,83 @@ class OllamaClient:
             "num_predict": config_data["max_output_tokens"],
             "frequency_penalty": config_data["frequency_penalty"]
         }
+        kwargs = {"model": model, "messages": messages, "tools": tool_options, "options": config}
+        if schema_name is not None:
+            kwargs["format"] = self.select_schema(schema_name)
+        return kwargs
+
+    def chat(self, model:str, config_data:dict, messages:list, tool_use:str=None, schema_name:str=None, cache:bool=None):
+        """
+        指定 schema_name 時模型會依照 response_schema 中對應的 class 輸出 JSON
+        """
+        key = _response_cache_key(cache, config_data, tool_use, "ollama", model, messages, schema_name)
+        response = _RESPONSE_CACHE.get(key) if key is not None else None
+        if response is not None:
+            return None, response
         try:
-            response = ollama.chat(model=model, messages=messages, tools=tool_options, options=config)
+            response = self._chat(**self._chat_kwargs(model, config_data, messages, tool_use, schema_name))
+            if key is not None:
+                _RESPONSE_CACHE[key] = response
             errmsg = None
             return errmsg, response
         except Exception as errmsg:
                 response = None
                 return errmsg, response
         
-    def sturctured_chat(self, model:str, config_data:dict, messages:list, tool_use:str=None, schema_name:str=None):
-        if tool_use == None:
-            tool_options = []
-        else:
-            tool_options = [tool_use]
-        schema = self.select_schema(schema_name)
-        config = {
-            "temperature": config_data["temperature"],
-            "top_p": config_data["top_p"],
-            "num_predict": config_data["max_output_tokens"],
-            "frequency_penalty": config_data["frequency_penalty"]
-        }
+    def chat_stream(self, model:str, config_data:dict, messages:list, tool_use:str=None, schema_name:str=None):
+        """
+        chat 的串流版本，逐一回傳模型生成的 chunk，發生錯誤時直接拋出例外
+        """
+        yield from self.client.chat(**self._chat_kwargs(model, config_data, messages, tool_use, schema_name), stream=True)
+
+    async def achat(self, model:str, config_data:dict, messages:list, tool_use:str=None, schema_name:str=None, cache:bool=None):
+        """
+        chat 的非同步版本
+        """
+        key = _response_cache_key(cache, config_data, tool_use, "ollama", model, messages, schema_name)
+        response = _RESPONSE_CACHE.get(key) if key is not None else None
+        if response is not None:
+            return None, response
         try:
-            response = ollama.chat(model=model, 
-                                   messages=messages, 
-                                   tools=tool_options, 
-                                   format=schema,
-                                   options=config)
+            response = await self._achat(**self._chat_kwargs(model, config_data, messages, tool_use, schema_name))
+            if key is not None:
+                _RESPONSE_CACHE[key] = response
             errmsg = None
             return errmsg, response
         except Exception as errmsg:
                 response = None
                 return errmsg, response
 
+    async def abatch_chat(self, jobs:list[dict]):
+        """
+        同時送出多筆 achat，jobs 中每個 dict 為 achat 的參數，依序回傳 (errmsg, response)
+        """
+        return await asyncio.gather(*(self.achat(**job) for job in jobs))
+
+    def parse_structured(self, response, schema_name:str=None):
+        """
+        解析 chat 指定 schema_name 時回傳的 JSON，指定 schema_name 時轉成對應的 response_schema 物件
+        """
+        data = orjson.loads(response["message"]["content"])
+        if schema_name is None:
+            return data
+        return getattr(response_schema, schema_name).model_validate(data)
+
 class llm_client:
 
     def __init__(self):
         self.config_path = "llm_config.yaml"
         self.prompt_path = "prompts.yaml"
+        import openai
         self.client = openai.OpenAI(
             api_key = os.getenv("MODEL_KEY"),
             base_url = os.getenv("LITELLM_BASE_URL"), 
             default_headers= {"conten-type": "application/json"}
             )
         
+    @staticmethod
     def select_schema(scheme_name):
-        schema_class = getattr(response_schema, scheme_name)
-        scheme_dict = schema_class.model_json_schema()
-        result_schema = {
-            "type": scheme_dict["type"],
-            "properties": scheme_dict["properties"],
-            "required": scheme_dict["required"]
-            }
-        return result_schema
+        return _select_schema(scheme_name)
         
     def chat(self, 
              model, 
@@ -0,0 +1,137 @@
+"""MCP toolset with a cached tool catalog.
+
+McpToolset.get_tools() 每次都會向 MCP Server 發送 tools/list，
+CachedMCPToolset 將結果快取在記憶體與暫存檔 (以 url + MCP_SCHEMA_VERSION 為 key)，
+同一台機器上的其他 worker 或重新載入後的 process 在 TTL 內可直接沿用，不需重新探索。
+工具呼叫則輪流分配到 MCP_POOL_SIZE 條獨立的連線，避免所有呼叫擠在同一條連線上。
+"""
+import os
+import time
+import hashlib
+import tempfile
+import itertools
+from datetime import timedelta
+from pathlib import Path
+from typing import List, Optional
+import httpx
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.mcp_tool.mcp_tool import McpTool
+from google.adk.tools.mcp_tool.mcp_toolset import McpToolset
+from google.adk.tools.mcp_tool.mcp_session_manager import (
+    MCPSessionManager,
+    StreamableHTTPConnectionParams,
+    retry_on_closed_resource,
+)
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.types import ListToolsResult
+
+MCP_CACHE_TTL = int(os.getenv("MCP_CACHE_TTL", "300"))
+# MCP Server 的工具有異動時，調整此版本號即可讓舊的快取失效
+MCP_SCHEMA_VERSION = os.getenv("MCP_SCHEMA_VERSION", "")
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "4"))
+
+def _pooled_http_client(headers=None, timeout=None, auth=None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout or httpx.Timeout(30.0),
+        auth=auth,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    )
+
+class _PooledSessionManager(MCPSessionManager):
+    def _create_client(self, merged_headers=None):
+        if not isinstance(self._connection_params, StreamableHTTPConnectionParams):
+            return super()._create_client(merged_headers)
+        return streamablehttp_client(
+            url=self._connection_params.url,
+            headers=merged_headers,
+            timeout=timedelta(seconds=self._connection_params.timeout),
+            sse_read_timeout=timedelta(seconds=self._connection_params.sse_read_timeout),
+            terminate_on_close=self._connection_params.terminate_on_close,
+            httpx_client_factory=_pooled_http_client,
+        )
+
+class MCPSessionPool:
+    """
+    Round-robins create_session() over several independent MCP session managers.
+    """
+
+    def __init__(self, connection_params, errlog, size: int = MCP_POOL_SIZE):
+        self._managers = [
+            _PooledSessionManager(connection_params=connection_params, errlog=errlog)
+            for _ in range(max(size, 1))
+        ]
+        self._next_manager = itertools.cycle(self._managers)
+
+    async def create_session(self, headers=None):
+        return await next(self._next_manager).create_session(headers=headers)
+
+    async def close(self):
+        for manager in self._managers:
+            await manager.close()
+
+class CachedMCPToolset(McpToolset):
+    """
+    McpToolset whose tools/list result is reused until MCP_CACHE_TTL expires.
+    """
+
+    def __init__(self, *, connection_params, **kwargs):
+        super().__init__(connection_params=connection_params, **kwargs)
+        self._mcp_session_manager = MCPSessionPool(connection_params, self._errlog)
+        cache_key = hashlib.sha1(f"{connection_params.url}|{MCP_SCHEMA_VERSION}".encode()).hexdigest()
+        self._cache_path = Path(tempfile.gettempdir()) / f"mcp_cache_{cache_key}.json"
+        self._tools_response = None
+        self._fetched_at = 0.0
+
+    def _load_cached(self) -> Optional[ListToolsResult]:
+        if self._tools_response is not None and time.time() - self._fetched_at < MCP_CACHE_TTL:
+            return self._tools_response
+        try:
+            mtime = self._cache_path.stat().st_mtime
+            if time.time() - mtime >= MCP_CACHE_TTL:
+                return None
+            self._tools_response = ListToolsResult.model_validate_json(self._cache_path.read_bytes())
+            self._fetched_at = mtime
+            return self._tools_response
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, tools_response: ListToolsResult) -> None:
+        self._tools_response = tools_response
+        self._fetched_at = time.time()
+        # 先寫入暫存檔再 rename，避免其他 process 讀到寫到一半的檔案
+        tmp_path = self._cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp_path.write_text(tools_response.model_dump_json(), encoding="utf-8")
+            os.replace(tmp_path, self._cache_path)
+        except OSError:
+            pass
+
+    @retry_on_closed_resource
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> List[BaseTool]:
+        tools_response = self._load_cached()
+        if tools_response is None:
+            headers = (
+                self._header_provider(readonly_context)
+                if self._header_provider and readonly_context
+                else None
+            )
+            session = await self._mcp_session_manager.create_session(headers=headers)
+            tools_response = await session.list_tools()
+            self._store(tools_response)
+
+        tools = []
+        for tool in tools_response.tools:
+            mcp_tool = McpTool(
+                mcp_tool=tool,
+                mcp_session_manager=self._mcp_session_manager,
+                auth_scheme=self._auth_scheme,
+                auth_credential=self._auth_credential,
+                require_confirmation=self._require_confirmation,
+                header_provider=self._header_provider,
+            )
+            if self._is_tool_selected(mcp_tool, readonly_context):
+                tools.append(mcp_tool)
+        return tools
@@ -0,0 +1,38 @@
+"""Bounded parallel tool dispatch for ADK agents.
+
+ADK 會在同一回合內以 asyncio.gather 同時派發所有 FunctionCall，
+這裡包裝 functions.__call_tool_async：
+- 透過 enable_parallel_tools() 登記的 agent 並行執行，並以 TOOL_CONCURRENCY_LIMIT 限制同一次 invocation 內同時執行的數量
+- 其他 agent 直接呼叫原本的 __call_tool_async，維持 ADK 預設的派發行為
+"""
+import os
+import asyncio
+import weakref
+from google.adk.flows.llm_flows import functions
+from utils.batch_tool import BATCH_TOOL_NAME
+
+TOOL_CONCURRENCY_LIMIT = int(os.getenv("TOOL_CONCURRENCY_LIMIT", "8"))
+
+_PARALLEL_AGENTS = set()
+_call_tool_async = getattr(functions, "__call_tool_async")
+# 以 invocation_id 對應的 Semaphore，只限制同一回合的工具呼叫，沒有工具在等待時會自動回收
+_parallel_semaphores = weakref.WeakValueDictionary()
+
+async def _dispatch_tool_async(tool, args, tool_context):
+    # batch 只負責派發，佔住名額會讓它的子呼叫互相等待；子呼叫會各自再經過這裡
+    if tool.name == BATCH_TOOL_NAME or tool_context.agent_name not in _PARALLEL_AGENTS:
+        return await _call_tool_async(tool, args=args, tool_context=tool_context)
+    semaphore = _parallel_semaphores.get(tool_context.invocation_id)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(TOOL_CONCURRENCY_LIMIT)
+        _parallel_semaphores[tool_context.invocation_id] = semaphore
+    async with semaphore:
+        return await _call_tool_async(tool, args=args, tool_context=tool_context)
+
+def enable_parallel_tools(*agent_names: str) -> None:
+    """
+    Opt the given agents in to concurrent tool execution bounded by TOOL_CONCURRENCY_LIMIT.
+    """
+    _PARALLEL_AGENTS.update(agent_names)
+    if getattr(functions, "__call_tool_async") is not _dispatch_tool_async:
+        setattr(functions, "__call_tool_async", _dispatch_tool_async)
@@ -4,4 +4,21 @@ from pydantic import BaseModel
 
 class Triztags(BaseModel):
     actions: list[str]
-    objects: list[str]
\ No newline at end of file
+    objects: list[str]
+
+def _build_json_schemas() -> dict:
+    """為本模組所有 BaseModel 子類別產生精簡的 JSON Schema，key 為 class 名稱"""
+    schemas = {}
+    for name, schema_class in list(globals().items()):
+        if isinstance(schema_class, type) and issubclass(schema_class, BaseModel) and schema_class is not BaseModel:
+            schema_dict = schema_class.model_json_schema()
+            schemas[name] = {
+                "type": schema_dict["type"],
+                "properties": schema_dict["properties"],
+                # 所有欄位都是 optional 時 pydantic 不會產生 required
+                "required": schema_dict.get("required", []),
+            }
+    return schemas
+
+# 載入時為每個 schema 產生一次 JSON Schema
+JSON_SCHEMAS = _build_json_schemas()